@@ -18,7 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import itertools as it
 import math
-from typing import Callable, List, Tuple
+from typing import Callable, List, NamedTuple, Optional, Tuple
 
 import numpy as np
 # pylint: disable=import-error, no-name-in-module
@@ -187,3 +187,126 @@ def calculate_rolloff(s21: List[Datapoint],
     decade_attn = attn / math.log10(factor)
     octave_attn = decade_attn * math.log10(2)
     return (octave_attn, decade_attn)
+
+
+class Resonance(NamedTuple):
+    index: int
+    freq: int
+    gain: float
+    phase: float  # degrees
+
+
+def resonance_at(freq: np.ndarray, s21: np.ndarray,
+                 index: int) -> Resonance:
+    """resonance values of the sweep point index"""
+    z = complex(s21[index])
+    mag = abs(z)
+    return Resonance(index, int(freq[index]),
+                     20 * math.log10(mag) if mag > 0 else -math.inf,
+                     math.degrees(np.angle(z)))
+
+
+def track_resonance(freq: np.ndarray, s21: np.ndarray,
+                    window: float = math.inf,
+                    floor: float = -100.0) -> Optional[Resonance]:
+    """find the maximum gain point of a sweep
+
+    Args:
+        freq (np.ndarray): sweep frequencies
+        s21 (np.ndarray): complex S21 values
+        window (float): only accept points with a phase within
+            +-window degrees
+        floor (float): only accept points with a gain above floor dB
+
+    Returns:
+        Optional[Resonance]: first point of maximum gain or None
+    """
+    s21 = np.asarray(s21)
+    with np.errstate(divide="ignore"):
+        gain = 20 * np.log10(np.abs(s21))
+    phase = np.degrees(np.angle(s21))
+    accepted = (gain > floor) & (np.abs(phase) < window)
+    if not accepted.any():
+        return None
+    index = int(np.argmax(np.where(accepted, gain, -np.inf)))
+    return Resonance(index, int(freq[index]),
+                     float(gain[index]), float(phase[index]))
+
+
+class PeakFit(NamedTuple):
+    freq: float
+    gain: float
+    phase: float  # degrees
+    freq_error: float  # standard deviation, nan if unknown
+
+
+def _fit_quadratic(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray,
+                                                          np.ndarray]:
+    """least squares y = a*x^2 + b*x + c, coefficients and covariance"""
+    design = np.column_stack((x * x, x, np.ones_like(x)))
+    coeffs, rss, _, _ = np.linalg.lstsq(design, y, rcond=None)
+    dof = len(x) - 3
+    variance = rss[0] / dof if dof > 0 and len(rss) else math.nan
+    return coeffs, variance * np.linalg.pinv(design.T @ design)
+
+
+def fit_resonance(freq: np.ndarray, s21: np.ndarray, index: int,
+                  points: int = 5, model: str = "lorentzian") -> PeakFit:
+    """interpolate the resonance around the sweep maximum at index
+
+    Args:
+        freq (np.ndarray): sweep frequencies
+        s21 (np.ndarray): complex S21 values
+        index (int): grid point of maximum gain, see track_resonance()
+        points (int): number of points around index to fit, at least 3
+        model (str): "lorentzian" fits 1/|S21|^2 as a parabola in
+            frequency, "parabolic" fits the gain in dB
+
+    Returns:
+        PeakFit: fitted frequency, gain and phase, falling back to the
+            grid point if the points around index do not form a peak
+    """
+    freq = np.asarray(freq, dtype=np.float64)
+    s21 = np.asarray(s21)
+    half = max(points, 3) // 2
+    start = min(max(index - half, 0), max(len(freq) - 2 * half - 1, 0))
+    window = slice(start, start + 2 * half + 1)
+    grid = resonance_at(freq, s21, index)
+    fallback = PeakFit(freq[index], grid.gain, grid.phase, math.nan)
+    if len(freq[window]) < 3:
+        return fallback
+
+    # center and scale for a well conditioned fit
+    scale = (freq[window][-1] - freq[window][0]) / 2 or 1.0
+    x = (freq[window] - freq[index]) / scale
+    power = np.abs(s21[window]) ** 2
+    with np.errstate(divide="ignore"):
+        if model == "lorentzian":
+            y, sign = 1 / power, 1
+        elif model == "parabolic":
+            y, sign = 10 * np.log10(power), -1
+        else:
+            raise ValueError(f"Unknown resonance model {model}")
+    if not np.isfinite(y).all():
+        return fallback
+    (a, b, c), cov = _fit_quadratic(x, y)
+    x0 = -b / (2 * a) if sign * a > 0 else math.inf
+    if not x[0] <= x0 <= x[-1]:
+        return fallback
+
+    peak = c - b * b / (4 * a)
+    if model == "lorentzian":
+        # a sharp peak can put the vertex of 1/|S21|^2 at or below zero
+        if not peak > 0:
+            return fallback
+        peak = -10 * math.log10(peak)
+    if not math.isfinite(peak):
+        return fallback
+    gain = peak
+    # propagate the fit covariance to x0 = -b / 2a
+    jacobian = np.array([b / (2 * a * a), -1 / (2 * a), 0.0])
+    x0_error = math.sqrt(max(jacobian @ cov @ jacobian, 0.0))
+    phase = np.interp(x0, x, np.unwrap(np.angle(s21[window])))
+    return PeakFit(float(freq[index] + x0 * scale), float(gain),
+                   math.degrees(math.remainder(phase, 2 * math.pi)),
+                   float(x0_error * scale))
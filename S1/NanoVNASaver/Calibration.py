@@ -4,8 +4,9 @@ import math
 import os
 import re
 from collections import defaultdict, UserDict
-from typing import List
+from typing import Dict, Hashable, List, Union
 
+import numpy as np
 from scipy.interpolate import interp1d
 
 from NanoVNASaver.RFTools import Datapoint
@@ -23,6 +24,10 @@ RXP_CAL_LINE = re.compile(r"""^\s*
 
 logger = logging.getLogger(__name__)
 
+# a single frequency or an array of them, and the matching reflection
+Frequency = Union[float, np.ndarray]
+Gamma = Union[complex, np.ndarray]
+
 
 def correct_delay(d: Datapoint, delay: float, reflect: bool = False):
     mult = 2 if reflect else 1
@@ -31,6 +36,22 @@ def correct_delay(d: Datapoint, delay: float, reflect: bool = False):
     return Datapoint(d.freq, corr_data.real, corr_data.imag)
 
 
+def correct_delay_array(freq: np.ndarray, values: np.ndarray,
+                        delay: float, reflect: bool = False) -> np.ndarray:
+    """array version of correct_delay"""
+    mult = 2 if reflect else 1
+    return values * np.exp(-2j * math.pi * np.asarray(freq) * delay * mult)
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray,
+            freq: np.ndarray) -> np.ndarray:
+    """element wise division raising ZeroDivisionError(freq) on a zero"""
+    zeros = np.flatnonzero(np.broadcast_to(denominator, np.shape(freq)) == 0)
+    if zeros.size:
+        raise ZeroDivisionError(int(freq[zeros[0]]))
+    return numerator / denominator
+
+
 class CalData(UserDict):
     def __init__(self):
         data = {
@@ -111,6 +132,9 @@ class CalDataSet:
 
 class Calibration:
     CAL_NAMES = ("short", "open", "load", "through", "thrurefl", "isolation",)
+    ERROR_TERMS = ("e00", "e11", "delta_e", "e10e01", "e30", "e22", "e10e32")
+    # resampled error term grids kept before the cache is flushed
+    TERMS_CACHE_SIZE = 64
     IDEAL_SHORT = complex(-1, 0)
     IDEAL_OPEN = complex(1, 0)
     IDEAL_LOAD = complex(0, 0)
@@ -120,6 +144,9 @@ class Calibration:
         self.notes = []
         self.dataset = CalDataSet()
         self.interp = {}
+        # bumped whenever the error terms change
+        self.revision = 0
+        self._terms_cache = {}
 
         self.useIdealShort = True
         self.shortL0 = 5.7 * 10E-12
@@ -168,42 +195,42 @@ class Calibration:
     def isValid2Port(self) -> bool:
         return self.dataset.complete2port()
 
-    def _calc_port_1(self, freq: int, cal: CalData):
+    def _calc_port_1(self, freq: np.ndarray, cal: Dict[str, np.ndarray]):
         g1 = self.gamma_short(freq)
         g2 = self.gamma_open(freq)
         g3 = self.gamma_load(freq)
 
-        gm1 = cal["short"].z
-        gm2 = cal["open"].z
-        gm3 = cal["load"].z
+        gm1 = cal["short"]
+        gm2 = cal["open"]
+        gm3 = cal["load"]
 
         denominator = (g1 * (g2 - g3) * gm1 +
                        g2 * g3 * gm2 - g2 * g3 * gm3 -
                        (g2 * gm2 - g3 * gm3) * g1)
-        cal["e00"] = - ((g2 * gm3 - g3 * gm3) * g1 * gm2 -
-                        (g2 * g3 * gm2 - g2 * g3 * gm3 -
-                         (g3 * gm2 - g2 * gm3) * g1) * gm1
-                        ) / denominator
-        cal["e11"] = ((g2 - g3) * gm1 - g1 * (gm2 - gm3) +
-                      g3 * gm2 - g2 * gm3) / denominator
-        cal["delta_e"] = - ((g1 * (gm2 - gm3) - g2 * gm2 + g3 *
-                             gm3) * gm1 + (g2 * gm3 - g3 * gm3) *
-                            gm2) / denominator
-
-    def _calc_port_2(self, freq: int, cal: CalData):
+        cal["e00"] = - _divide((g2 * gm3 - g3 * gm3) * g1 * gm2 -
+                               (g2 * g3 * gm2 - g2 * g3 * gm3 -
+                                (g3 * gm2 - g2 * gm3) * g1) * gm1,
+                               denominator, freq)
+        cal["e11"] = _divide((g2 - g3) * gm1 - g1 * (gm2 - gm3) +
+                             g3 * gm2 - g2 * gm3, denominator, freq)
+        cal["delta_e"] = - _divide((g1 * (gm2 - gm3) - g2 * gm2 + g3 *
+                                    gm3) * gm1 + (g2 * gm3 - g3 * gm3) *
+                                   gm2, denominator, freq)
+
+    def _calc_port_2(self, freq: np.ndarray, cal: Dict[str, np.ndarray]):
         gt = self.gamma_through(freq)
 
-        gm4 = cal["through"].z
-        gm5 = cal["thrurefl"].z
-        gm6 = cal["isolation"].z
+        gm4 = cal["through"]
+        gm5 = cal["thrurefl"]
+        gm6 = cal["isolation"]
         gm7 = gm5 - cal["e00"]
 
-        cal["e30"] = cal["isolation"].z
+        cal["e30"] = cal["isolation"]
         cal["e10e01"] = cal["e00"] * cal["e11"] - cal["delta_e"]
-        cal["e22"] = gm7 / (
-            gm7 * cal["e11"] * gt ** 2 + cal["e10e01"] * gt ** 2)
-        cal["e10e32"] = (gm4 - gm6) * (
-            1 - cal["e11"] * cal["e22"] * gt ** 2) / gt
+        cal["e22"] = _divide(
+            gm7, gm7 * cal["e11"] * gt ** 2 + cal["e10e01"] * gt ** 2, freq)
+        cal["e10e32"] = _divide((gm4 - gm6) * (
+            1 - cal["e11"] * cal["e22"] * gt ** 2), gt, freq)
 
     def calc_corrections(self):
         if not self.isValid1Port():
@@ -214,69 +241,112 @@ class Calibration:
                 "must be completed for calibration to be applied.")
         logger.debug("Calculating calibration for %d points.", self.size())
 
-        for freq, caldata in self.dataset.items():
-            try:
-                self._calc_port_1(freq, caldata)
-                if self.isValid2Port():
-                    self._calc_port_2(freq, caldata)
-            except ZeroDivisionError as exc:
-                self.isCalculated = False
-                logger.error(
-                    "Division error - did you use the same measurement"
-                    " for two of short, open and load?")
-                raise ValueError(
-                    f"Two of short, open and load returned the same"
-                    f" values at frequency {freq}Hz.") from exc
+        caldata = list(self.dataset.values())
+        two_port = self.isValid2Port()
+        names = Calibration.CAL_NAMES if two_port else \
+            Calibration.CAL_NAMES[:3]
+        freq = np.array([c["freq"] for c in caldata], dtype=np.float64)
+        cal = {name: np.array([c[name].z for c in caldata])
+               for name in names}
+        for name in Calibration.ERROR_TERMS:
+            cal[name] = np.zeros(len(caldata), dtype=np.complex128)
+        try:
+            self._calc_port_1(freq, cal)
+            if two_port:
+                self._calc_port_2(freq, cal)
+        except ZeroDivisionError as exc:
+            self.isCalculated = False
+            logger.error(
+                "Division error - did you use the same measurement"
+                " for two of short, open and load?")
+            raise ValueError(
+                f"Two of short, open and load returned the same"
+                f" values at frequency {exc.args[0]}Hz.") from exc
+
+        for name in Calibration.ERROR_TERMS:
+            for data, value in zip(caldata, cal[name].tolist()):
+                data[name] = value
 
         self.gen_interpolation()
         self.isCalculated = True
         logger.debug("Calibration correctly calculated.")
 
-    def gamma_short(self, freq: int) -> complex:
+    # The gamma_* models accept a single frequency or a frequency array
+
+    def gamma_short(self, freq: Frequency) -> Gamma:
         g = Calibration.IDEAL_SHORT
         if not self.useIdealShort:
             logger.debug("Using short calibration set values.")
-            Zsp = complex(0, 2 * math.pi * freq * (
+            freq = np.asarray(freq, dtype=np.float64)
+            Zsp = 2j * math.pi * freq * (
                 self.shortL0 + self.shortL1 * freq +
-                self.shortL2 * freq ** 2 + self.shortL3 * freq ** 3))
+                self.shortL2 * freq ** 2 + self.shortL3 * freq ** 3)
             # Referencing https://arxiv.org/pdf/1606.02446.pdf (18) - (21)
-            g = (Zsp / 50 - 1) / (Zsp / 50 + 1) * cmath.exp(
-                complex(0, 2 * math.pi * 2 * freq * self.shortLength * -1))
+            g = (Zsp / 50 - 1) / (Zsp / 50 + 1) * np.exp(
+                2j * math.pi * 2 * freq * self.shortLength * -1)
         return g
 
-    def gamma_open(self, freq: int) -> complex:
+    def gamma_open(self, freq: Frequency) -> Gamma:
         g = Calibration.IDEAL_OPEN
         if not self.useIdealOpen:
             logger.debug("Using open calibration set values.")
-            Zop = complex(0, 2 * math.pi * freq * (
+            freq = np.asarray(freq, dtype=np.float64)
+            Zop = 2j * math.pi * freq * (
                 self.openC0 + self.openC1 * freq +
-                self.openC2 * freq ** 2 + self.openC3 * freq ** 3))
-            g = ((1 - 50 * Zop) / (1 + 50 * Zop)) * cmath.exp(
-                complex(0, 2 * math.pi * 2 * freq * self.openLength * -1))
+                self.openC2 * freq ** 2 + self.openC3 * freq ** 3)
+            g = ((1 - 50 * Zop) / (1 + 50 * Zop)) * np.exp(
+                2j * math.pi * 2 * freq * self.openLength * -1)
         return g
 
-    def gamma_load(self, freq: int) -> complex:
+    def gamma_load(self, freq: Frequency) -> Gamma:
         g = Calibration.IDEAL_LOAD
         if not self.useIdealLoad:
             logger.debug("Using load calibration set values.")
+            freq = np.asarray(freq, dtype=np.float64)
             Zl = complex(self.loadR, 0)
             if self.loadC > 0:
                 Zl = self.loadR / \
-                    complex(1, 2 * self.loadR * math.pi * freq * self.loadC)
+                    (1 + 2j * self.loadR * math.pi * freq * self.loadC)
             if self.loadL > 0:
-                Zl = Zl + complex(0, 2 * math.pi * freq * self.loadL)
-            g = (Zl / 50 - 1) / (Zl / 50 + 1) * cmath.exp(
-                complex(0, 2 * math.pi * 2 * freq * self.loadLength * -1))
+                Zl = Zl + 2j * math.pi * freq * self.loadL
+            g = (Zl / 50 - 1) / (Zl / 50 + 1) * np.exp(
+                2j * math.pi * 2 * freq * self.loadLength * -1)
         return g
 
-    def gamma_through(self, freq: int) -> complex:
+    def gamma_through(self, freq: Frequency) -> Gamma:
         g = complex(1, 0)
         if not self.useIdealThrough:
             logger.debug("Using through calibration set values.")
-            g = cmath.exp(complex(0, 1) * 2 * math.pi *
-                          self.throughLength * freq * -1)
+            freq = np.asarray(freq, dtype=np.float64)
+            g = np.exp(1j * 2 * math.pi *
+                       self.throughLength * freq * -1)
         return g
 
+    def invalidate_terms(self):
+        """drop all error terms resampled onto sweep grids"""
+        self.revision += 1
+        self._terms_cache = {}
+
+    def error_terms(self, freq: np.ndarray,
+                    key: Hashable = None) -> Dict[str, np.ndarray]:
+        """error terms interpolated onto freq
+
+        If a key (e.g. sweep parameters and segment index) is given, the
+        resampled terms are cached for it until the calibration changes.
+        """
+        if key is None:
+            return {name: self.interp[name](freq)
+                    for name in Calibration.ERROR_TERMS}
+        cache_key = (key, self.revision)
+        terms = self._terms_cache.get(cache_key)
+        if terms is None or not np.array_equal(terms["freq"], freq):
+            if len(self._terms_cache) >= Calibration.TERMS_CACHE_SIZE:
+                self._terms_cache = {}
+            terms = self.error_terms(freq)
+            terms["freq"] = np.array(freq)
+            self._terms_cache[cache_key] = terms
+        return terms
+
     def gen_interpolation(self):
         freq = []
         e00 = []
@@ -297,6 +367,7 @@ class Calibration:
             e22.append(caldata["e22"])
             e10e32.append(caldata["e10e32"])
 
+        self.invalidate_terms()
         self.interp = {
             "e00": interp1d(freq, e00,
                             kind="slinear", bounds_error=False,
@@ -321,17 +392,32 @@ class Calibration:
                                fill_value=(e10e32[0], e10e32[-1])),
         }
 
+    def correct11_array(self, freq: np.ndarray, s11: np.ndarray,
+                        key: Hashable = None) -> np.ndarray:
+        """apply the 1-port correction to a whole frequency array at once"""
+        t = self.error_terms(freq, key)
+        return (s11 - t["e00"]) / ((s11 * t["e11"]) - t["delta_e"])
+
+    def correct21_array(self, freq: np.ndarray,
+                        s21: np.ndarray, s11: np.ndarray,
+                        key: Hashable = None) -> np.ndarray:
+        """apply the 2-port correction to a whole frequency array at once
+
+        s11 are the raw (uncorrected) reflection values at the same
+        frequencies
+        """
+        t = self.error_terms(freq, key)
+        return (s21 - t["e30"]) / t["e10e32"] * (
+            t["e10e01"] / (t["e11"] * s11 - t["delta_e"]))
+
     def correct11(self, dp: Datapoint):
-        i = self.interp
-        s11 = (dp.z - i["e00"](dp.freq)) / (
-            (dp.z * i["e11"](dp.freq)) - i["delta_e"](dp.freq))
+        s11 = complex(self.correct11_array(
+            np.array([dp.freq]), np.array([dp.z]))[0])
         return Datapoint(dp.freq, s11.real, s11.imag)
 
     def correct21(self, dp: Datapoint, dp11: Datapoint):
-        i = self.interp
-        s21 = (dp.z - i["e30"](dp.freq)) / i["e10e32"](dp.freq)
-        s21 = s21 * (i["e10e01"](dp.freq) / (i["e11"](dp.freq)
-                     * dp11.z - i["delta_e"](dp.freq)))
+        s21 = complex(self.correct21_array(
+            np.array([dp.freq]), np.array([dp.z]), np.array([dp11.z]))[0])
         return Datapoint(dp.freq, s21.real, s21.imag)
 
     # TODO: implement tests
@@ -355,6 +441,7 @@ class Calibration:
     def load(self, filename):
         self.source = os.path.basename(filename)
         self.dataset = CalDataSet()
+        self.invalidate_terms()
         self.notes = []
 
         parsed_header = False
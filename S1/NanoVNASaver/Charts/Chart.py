@@ -102,6 +102,8 @@ class Chart(QtWidgets.QWidget):
 
         self.data: List[Datapoint] = []
         self.reference: List[Datapoint] = []
+        # changes with data and reference, keys the cached drawing
+        self.revision = 0
 
         self.markers: List[Marker] = []
         self.swrMarkers: Set[float] = set()
@@ -119,14 +121,18 @@ class Chart(QtWidgets.QWidget):
 
     def setReference(self, data):
         self.reference = data
+        self.revision += 1
         self.update()
 
     def resetReference(self):
         self.reference = []
+        self.revision += 1
         self.update()
 
     def setData(self, data):
+        """show data, call again after changing the list in place"""
         self.data = data
+        self.revision += 1
         self.update()
 
     def setMarkers(self, markers):
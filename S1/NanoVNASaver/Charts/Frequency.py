@@ -1,6 +1,6 @@
 import math
 import logging
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 import numpy as np
 from PyQt5 import QtWidgets, QtGui, QtCore
@@ -27,6 +27,74 @@ from tkinter import ttk
 logger = logging.getLogger(__name__)
 
 
+def polygon(x: np.ndarray, y: np.ndarray) -> QtGui.QPolygonF:
+    """QPolygonF of the points x, y, filled through its memory"""
+    poly = QtGui.QPolygonF()
+    poly.fill(QtCore.QPointF(), len(x))
+    if len(x):
+        buffer = poly.data()
+        buffer.setsize(16 * len(x))
+        points = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+        points[:, 0], points[:, 1] = x, y
+    return poly
+
+
+def clip_segments(x: np.ndarray, y: np.ndarray,
+                  rect: Tuple[float, float, float, float]
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """clip the segments of the polyline x, y to rect (left, top, right,
+    bottom), Liang-Barsky on all segments at once
+
+    Returns the indices of the segments that are at least partly inside
+    and the start and end points of their visible parts as (n, 2) arrays.
+    Segments with a nan end are dropped.
+    """
+    x0, y0, dx, dy = x[:-1], y[:-1], np.diff(x), np.diff(y)
+    left, top, right, bottom = rect
+    t0, t1 = np.zeros(len(dx)), np.ones(len(dx))
+    visible = np.isfinite(dx) & np.isfinite(dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x0 - left), (dx, right - x0),
+                     (-dy, y0 - top), (dy, bottom - y0)):
+            r = q / p
+            visible &= (p != 0) | (q >= 0)
+            t0 = np.where(p < 0, np.maximum(t0, r), t0)
+            t1 = np.where(p > 0, np.minimum(t1, r), t1)
+    index = np.flatnonzero(visible & (t0 <= t1))
+    t0, t1 = t0[index], t1[index]
+    start = np.column_stack((x0[index] + t0 * dx[index],
+                             y0[index] + t0 * dy[index]))
+    end = np.column_stack((x0[index] + t1 * dx[index],
+                           y0[index] + t1 * dy[index]))
+    return index, start, end
+
+
+def decimate(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """indices of the points needed to draw the polyline x, y
+
+    Of every run of points in the same pixel column the first, lowest,
+    highest and last are kept, which draws the same pixels as all of
+    them. nan values end a run and are kept.
+    """
+    size = len(x)
+    if size < 3:
+        return np.arange(size)
+    finite = np.isfinite(y)
+    new_run = np.ones(size, dtype=bool)
+    new_run[1:] = (x[1:] != x[:-1]) | ~finite[1:] | ~finite[:-1]
+    starts = np.flatnonzero(new_run)
+    run = np.cumsum(new_run) - 1
+    values = np.where(finite, y, 0.0)
+    keep = new_run.copy()
+    keep[starts[1:] - 1] = keep[-1] = True
+    for extreme in (np.minimum, np.maximum):
+        hits = np.flatnonzero(values == extreme.reduceat(values, starts)[run])
+        first = np.ones(len(hits), dtype=bool)
+        first[1:] = run[hits[1:]] != run[hits[:-1]]
+        keep[hits[first]] = True
+    return np.flatnonzero(keep)
+
+
 class FrequencyChart(Chart):
 
     def __init__(self, name):
@@ -60,6 +128,11 @@ class FrequencyChart(Chart):
         self.maxValue = 1
         self.span = 1
 
+        # pixel positions of the last drawn traces, see _trace()
+        self._traces: List[Tuple[list, tuple, tuple, tuple]] = []
+        # axis scaling and tick labels, see _cached()
+        self._layouts: Dict[str, Tuple[tuple, Any]] = {}
+
         self.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
         mode_group = QtWidgets.QActionGroup(self)
         self.menu = QtWidgets.QMenu()
@@ -327,6 +400,20 @@ class FrequencyChart(Chart):
                 self.dim.width * (d.freq - self.fstart) / span)
         return math.floor(self.width() / 2)
 
+    def getXPositions(self, freq: np.ndarray) -> np.ndarray:
+        """getXPosition of a frequency array"""
+        freq = np.asarray(freq, dtype=np.float64)
+        span = self.fstop - self.fstart
+        if span <= 0:
+            return np.full(len(freq), math.floor(self.width() / 2), float)
+        if self.logarithmicX:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return self.leftMargin + np.round(
+                    self.dim.width * np.log(freq / self.fstart) /
+                    (math.log(self.fstop) - math.log(self.fstart)))
+        return self.leftMargin + np.round(
+            self.dim.width * (freq - self.fstart) / span)
+
     def getYPosition(self, d: Datapoint) -> int:
         try:
             return (
@@ -336,6 +423,19 @@ class FrequencyChart(Chart):
         except ValueError:
             return self.topMargin
 
+    def getYPositions(self, data: List[Datapoint]) -> np.ndarray:
+        """getYPosition of all data, nan where there is no value
+
+        Charts override this with array math, the default asks
+        getYPosition point by point.
+        """
+        return self._y_positions(data, self.getYPosition)
+
+    @staticmethod
+    def _y_positions(data: List[Datapoint], y_function) -> np.ndarray:
+        return np.array([np.nan if y is None else y
+                         for y in map(y_function, data)], dtype=np.float64)
+
     def frequencyAtPosition(self, x, limit=True) -> int:
         """
         Calculates the frequency at a given X-position
@@ -504,7 +604,8 @@ class FrequencyChart(Chart):
         if self.bands.enabled:
             self.drawBands(qp, self.fstart, self.fstop)
 
-        min_value, max_value = self._find_scaling()
+        min_value, max_value = self._cached(
+            "scaling", self._scaling_key(), self._find_scaling)
         self.maxValue = max_value
         self.minValue = min_value
         span = max_value - min_value
@@ -515,15 +616,12 @@ class FrequencyChart(Chart):
             span = 1e-15
         self.span = span
 
-        target_ticks = math.floor(self.dim.height / 60)
-        fmt = Format(max_nr_digits=1)
-        for i in range(target_ticks):
-            val = min_value + (i / target_ticks) * span
-            y = self.topMargin + \
-                round((self.maxValue - val) / self.span * self.dim.height)
+        ticks, max_label, min_label = self._cached(
+            "value_ticks", (min_value, max_value, self.topMargin,
+                            self.dim.height), self._value_axis)
+        for y, valstr in ticks:
             qp.setPen(Chart.color.text)
-            if val != min_value:
-                valstr = str(Value(val, fmt=fmt))
+            if valstr:
                 qp.drawText(3, y + 3, valstr)
             qp.setPen(QtGui.QPen(Chart.color.foreground))
             qp.drawLine(self.leftMargin - 5, y,
@@ -533,15 +631,32 @@ class FrequencyChart(Chart):
         qp.drawLine(self.leftMargin - 5, self.topMargin,
                     self.leftMargin + self.dim.width, self.topMargin)
         qp.setPen(Chart.color.text)
-        qp.drawText(3, self.topMargin + 4, str(Value(max_value, fmt=fmt)))
-        qp.drawText(3, self.dim.height + self.topMargin,
-                    str(Value(min_value, fmt=fmt)))
+        qp.drawText(3, self.topMargin + 4, max_label)
+        qp.drawText(3, self.dim.height + self.topMargin, min_label)
         self.drawFrequencyTicks(qp)
 
         self.drawData(qp, self.data, Chart.color.sweep)
         self.drawData(qp, self.reference, Chart.color.reference)
         self.drawMarkers(qp)
 
+    def _cached(self, name: str, key: tuple, compute: Callable[[], Any]):
+        """result of compute(), reused until key changes
+
+        Repaints for mouse moves or marker drags leave the data and the
+        view alone, so they skip rescaling and reformatting the axes.
+        """
+        cached = self._layouts.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, compute())
+            self._layouts[name] = cached
+        return cached[1]
+
+    def _scaling_key(self) -> tuple:
+        """everything the value axis scaling depends on"""
+        return (self.revision, self.fixedValues,
+                self.minDisplayValue, self.maxDisplayValue,
+                self.fstart, self.fstop, self.logarithmicY)
+
     def _find_scaling(self) -> Tuple[float, float]:
         min_value = self.minDisplayValue / 10e11
         max_value = self.maxDisplayValue / 10e11
@@ -559,9 +674,41 @@ class FrequencyChart(Chart):
             max_value = max(max_value, val)
         return (min_value, max_value)
 
+    def _value_axis(self) -> Tuple[List[Tuple[int, str]], str, str]:
+        """y positions and labels of the value ticks, labels of the
+        maximum and minimum"""
+        target_ticks = math.floor(self.dim.height / 60)
+        fmt = Format(max_nr_digits=1)
+        ticks = []
+        for i in range(target_ticks):
+            val = self.minValue + (i / target_ticks) * self.span
+            y = self.topMargin + \
+                round((self.maxValue - val) / self.span * self.dim.height)
+            ticks.append((y, str(Value(val, fmt=fmt))
+                          if val != self.minValue else ""))
+        return (ticks, str(Value(self.maxValue, fmt=fmt)),
+                str(Value(self.minValue, fmt=fmt)))
+
     def drawFrequencyTicks(self, qp):
-        fspan = self.fstop - self.fstart
+        start, ticks = self._cached(
+            "frequency_ticks", (self.fstart, self.fstop, self.logarithmicX,
+                                self.leftMargin, self.dim.width),
+            self._frequency_ticks)
         qp.setPen(Chart.color.text)
+        qp.drawText(self.leftMargin - 20,
+                    self.topMargin + self.dim.height + 15, start)
+        for x, label in ticks:
+            qp.setPen(QtGui.QPen(Chart.color.foreground))
+            qp.drawLine(x, self.topMargin, x,
+                        self.topMargin + self.dim.height + 5)
+            qp.setPen(Chart.color.text)
+            qp.drawText(x - 20,
+                        self.topMargin + self.dim.height + 15, label)
+
+    def _frequency_ticks(self) -> Tuple[str, List[Tuple[int, str]]]:
+        """label of the start frequency, x positions and labels of the
+        frequency ticks"""
+        fspan = self.fstop - self.fstart
         # Number of ticks does not include the origin
         ticks = math.floor(self.dim.width / 100)
 
@@ -571,10 +718,7 @@ class FrequencyChart(Chart):
         else:
             my_format_frequency = format_frequency_chart_2
 
-        qp.drawText(self.leftMargin - 20,
-                    self.topMargin + self.dim.height + 15,
-                    my_format_frequency(self.fstart))
-
+        positions = []
         for i in range(ticks):
             x = self.leftMargin + round((i + 1) * self.dim.width / ticks)
             if self.logarithmicX:
@@ -585,13 +729,8 @@ class FrequencyChart(Chart):
                         math.log(self.fstart)))
             else:
                 freq = round(fspan / ticks * (i + 1) + self.fstart)
-            qp.setPen(QtGui.QPen(Chart.color.foreground))
-            qp.drawLine(x, self.topMargin, x,
-                        self.topMargin + self.dim.height + 5)
-            qp.setPen(Chart.color.text)
-            qp.drawText(x - 20,
-                        self.topMargin + self.dim.height + 15,
-                        my_format_frequency(freq))
+            positions.append((x, my_format_frequency(freq)))
+        return my_format_frequency(self.fstart), positions
 
     def drawBands(self, qp, fstart, fstop):
         qp.setBrush(self.bands.color)
@@ -616,37 +755,80 @@ class FrequencyChart(Chart):
 
     def drawData(self, qp: QtGui.QPainter, data: List[Datapoint],
                  color: QtGui.QColor, y_function=None):
+        if not data:
+            return
         if y_function is None:
-            y_function = self.getYPosition
+            points, line = self._trace(data)
+        else:
+            points, line = self._reduce(
+                self.getXPositions([d.freq for d in data]),
+                self._y_positions(data, y_function))
+        self.drawTrace(qp, points, line, color)
+
+    def _view_key(self) -> tuple:
+        """everything the pixel positions of a trace depend on"""
+        return (self.revision, self.fstart, self.fstop, self.logarithmicX,
+                self.logarithmicY, self.minValue, self.maxValue, self.span,
+                self.leftMargin, self.topMargin, self.dim.width,
+                self.dim.height, self.width())
+
+    def _plot_rect(self) -> Tuple[int, int, int, int]:
+        return (self.leftMargin, self.topMargin,
+                self.leftMargin + self.dim.width,
+                self.topMargin + self.dim.height)
+
+    def _trace(self, data: List[Datapoint]) -> Tuple[tuple, tuple]:
+        """points and line of data, cached until the data or the view
+        changes"""
+        key = self._view_key()
+        for cached, cached_key, points, line in self._traces:
+            if cached is data and cached_key == key:
+                return points, line
+        points, line = self._reduce(self.getXPositions([d.freq for d in data]),
+                                    self.getYPositions(data))
+        self._traces = [trace for trace in self._traces
+                        if trace[0] is self.data or
+                        trace[0] is self.reference][-3:]
+        self._traces.append((data, key, points, line))
+        return points, line
+
+    def _reduce(self, x: np.ndarray, y: np.ndarray) -> Tuple[tuple, tuple]:
+        """the visible points of a trace, each pixel once, and its line,
+        decimated if it has more points than the chart has pixels"""
+        left, top, right, bottom = self._plot_rect()
+        inside = (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+        _, first = np.unique(x[inside] * (bottom + 1) + y[inside],
+                             return_index=True)
+        points = (x[inside][first], y[inside][first])
+        if len(x) > 2 * self.dim.width:
+            keep = decimate(x, y)
+            x, y = x[keep], y[keep]
+        return points, (x, y)
+
+    def drawTrace(self, qp: QtGui.QPainter,
+                  points: Tuple[np.ndarray, np.ndarray],
+                  line: Tuple[np.ndarray, np.ndarray], color: QtGui.QColor):
+        """draw the points and, if enabled, the line of a trace given as
+        pixel arrays, see _reduce(), nan y values are left out"""
         pen = QtGui.QPen(color)
         pen.setWidth(self.dim.point)
+        qp.setPen(pen)
+        qp.drawPoints(polygon(*points))
+        if not self.flag.draw_lines or len(line[0]) < 2:
+            return
+
         line_pen = QtGui.QPen(color)
         line_pen.setWidth(self.dim.line)
-        qp.setPen(pen)
-        for i, d in enumerate(data):
-            x = self.getXPosition(d)
-            y = y_function(d)
-            if y is None:
-                continue
-            if self.isPlotable(x, y):
-                qp.drawPoint(int(x), int(y))
-            if self.flag.draw_lines and i > 0:
-                prevx = self.getXPosition(data[i - 1])
-                prevy = y_function(data[i - 1])
-                if prevy is None:
-                    continue
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y):
-                    if self.isPlotable(prevx, prevy):
-                        qp.drawLine(x, y, prevx, prevy)
-                    else:
-                        new_x, new_y = self.getPlotable(
-                            x, y, prevx, prevy)
-                        qp.drawLine(x, y, new_x, new_y)
-                elif self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(prevx, prevy, x, y)
-                    qp.drawLine(prevx, prevy, new_x, new_y)
-                qp.setPen(pen)
+        qp.setPen(line_pen)
+        index, start, end = clip_segments(*line, self._plot_rect())
+        if not len(index):
+            return
+        # one polyline per run of segments joined at unclipped points
+        breaks = np.flatnonzero(
+            (np.diff(index) != 1) | (end[:-1] != start[1:]).any(axis=1)) + 1
+        for run in np.split(np.arange(len(index)), breaks):
+            vertices = np.vstack((start[run[:1]], end[run]))
+            qp.drawPolyline(polygon(vertices[:, 0], vertices[:, 1]))
 
     def drawMarkers(self, qp, data=None, y_function=None):
         if data is None:
@@ -18,14 +18,14 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import math
 import logging
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 
 from PyQt5 import QtGui
 
 from NanoVNASaver.Charts.Chart import Chart
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.RFTools import Datapoint, group_delays
 from .Frequency import FrequencyChart
 logger = logging.getLogger(__name__)
 
@@ -71,30 +71,15 @@ class GroupDelayChart(FrequencyChart):
     def calculateGroupDelay(self):
         self.groupDelay = self.calc_data(self.data)
         self.groupDelayReference = self.calc_data(self.reference)
+        self.revision += 1
         self.update()
 
-    def calc_data(self, data: List[Datapoint]):
-        data_len = len(data)
-        if data_len <= 1:
-            return []
-        unwrapped = np.degrees(np.unwrap([d.phase for d in data]))
-        delay_data = []
-        for i, d in enumerate(data):
-            # TODO: Replace with call to RFTools.groupDelay
-            if i == 0:
-                phase_change = unwrapped[1] - unwrapped[i]
-                freq_change = data[1].freq - d.freq
-            elif i == data_len - 1:
-                phase_change = unwrapped[-1] - unwrapped[-2]
-                freq_change = d.freq - data[-2].freq
-            else:
-                phase_change = unwrapped[i + 1] - unwrapped[i - 1]
-                freq_change = data[i + 1].freq - data[i - 1].freq
-            delay = (-phase_change / (freq_change * 360)) * 10e8
-            if not self.reflective:
-                delay /= 2
-            delay_data.append(delay)
-        return delay_data
+    def calc_data(self, data: List[Datapoint]) -> np.ndarray:
+        """group delay of data in ns, halved for a transmissive chart"""
+        delay = group_delays(data) * 1e9
+        if not self.reflective:
+            delay /= 2
+        return delay
 
     def drawValues(self, qp: QtGui.QPainter):
         if len(self.data) == 0 and len(self.reference) == 0:
@@ -104,15 +89,8 @@ class GroupDelayChart(FrequencyChart):
         line_pen = QtGui.QPen(Chart.color.sweep)
         line_pen.setWidth(self.dim.line)
 
-        if self.fixedValues:
-            min_delay = self.minDisplayValue
-            max_delay = self.maxDisplayValue
-        elif self.data:
-            min_delay = math.floor(np.min(self.groupDelay))
-            max_delay = math.ceil(np.max(self.groupDelay))
-        elif self.reference:
-            min_delay = math.floor(np.min(self.groupDelayReference))
-            max_delay = math.ceil(np.max(self.groupDelayReference))
+        min_delay, max_delay = self._cached(
+            "scaling", self._scaling_key(), self._find_scaling)
 
         span = max_delay - min_delay
         if span == 0:
@@ -121,21 +99,14 @@ class GroupDelayChart(FrequencyChart):
         self.maxDelay = max_delay
         self.span = span
 
-        tickcount = math.floor(self.dim.height / 60)
-        for i in range(tickcount):
-            delay = min_delay + span * i / tickcount
-            y = self.topMargin + \
-                round((self.maxDelay - delay) / self.span * self.dim.height)
-            if delay not in {min_delay, max_delay}:
-                qp.setPen(QtGui.QPen(Chart.color.text))
-                # TODO use format class
-                digits = 0 if delay == 0 else max(
-                    0, min(2, math.floor(3 - math.log10(abs(delay)))))
-                delaystr = str(round(delay, digits if digits != 0 else None))
-                qp.drawText(3, y + 3, delaystr)
-                qp.setPen(QtGui.QPen(Chart.color.foreground))
-                qp.drawLine(self.leftMargin - 5, y,
-                            self.leftMargin + self.dim.width, y)
+        for y, delaystr in self._cached(
+                "value_ticks", (min_delay, max_delay, self.topMargin,
+                                self.dim.height), self._value_ticks):
+            qp.setPen(QtGui.QPen(Chart.color.text))
+            qp.drawText(3, y + 3, delaystr)
+            qp.setPen(QtGui.QPen(Chart.color.foreground))
+            qp.drawLine(self.leftMargin - 5, y,
+                        self.leftMargin + self.dim.width, y)
 
         qp.drawLine(self.leftMargin - 5,
                     self.topMargin,
@@ -153,39 +124,34 @@ class GroupDelayChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        self.draw_data(qp, Chart.color.sweep,
-                       self.data, self.groupDelay)
-        self.draw_data(qp, Chart.color.reference,
-                       self.reference, self.groupDelayReference)
+        self.drawData(qp, self.data, Chart.color.sweep)
+        self.drawData(qp, self.reference, Chart.color.reference)
 
         self.drawMarkers(qp)
 
-    def draw_data(self, qp: QtGui.QPainter, color: QtGui.QColor,
-                  data: List[Datapoint], delay: List[Datapoint]):
-        pen = QtGui.QPen(color)
-        pen.setWidth(self.dim.point)
-        line_pen = QtGui.QPen(color)
-        line_pen.setWidth(self.dim.line)
-        qp.setPen(pen)
-        for i, d in enumerate(data):
-            x = self.getXPosition(d)
-            y = self.getYPositionFromDelay(delay[i])
-            if self.isPlotable(x, y):
-                qp.drawPoint(int(x), int(y))
-            if self.flag.draw_lines and i > 0:
-                prevx = self.getXPosition(data[i - 1])
-                prevy = self.getYPositionFromDelay(delay[i - 1])
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y):
-                    if self.isPlotable(prevx, prevy):
-                        qp.drawLine(x, y, prevx, prevy)
-                    else:
-                        new_x, new_y = self.getPlotable(x, y, prevx, prevy)
-                        qp.drawLine(x, y, new_x, new_y)
-                elif self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(prevx, prevy, x, y)
-                    qp.drawLine(prevx, prevy, new_x, new_y)
-                qp.setPen(pen)
+    def _find_scaling(self) -> Tuple[int, int]:
+        if self.fixedValues:
+            return self.minDisplayValue, self.maxDisplayValue
+        delay = self.groupDelay if self.data else self.groupDelayReference
+        return math.floor(np.min(delay)), math.ceil(np.max(delay))
+
+    def _value_ticks(self) -> List[Tuple[int, str]]:
+        """y positions and labels of the ticks between the minimum and
+        maximum delay"""
+        tickcount = math.floor(self.dim.height / 60)
+        ticks = []
+        for i in range(tickcount):
+            delay = self.minDelay + self.span * i / tickcount
+            if delay in {self.minDelay, self.maxDelay}:
+                continue
+            y = self.topMargin + \
+                round((self.maxDelay - delay) / self.span * self.dim.height)
+            # TODO use format class
+            digits = 0 if delay == 0 else max(
+                0, min(2, math.floor(3 - math.log10(abs(delay)))))
+            ticks.append((y, str(round(delay, digits if digits != 0
+                                       else None))))
+        return ticks
 
     def getYPosition(self, d: Datapoint) -> int:
         # TODO: Find a faster way than these expensive "d in data" lookups
@@ -198,6 +164,21 @@ class GroupDelayChart(FrequencyChart):
                 delay = 0
         return self.getYPositionFromDelay(delay)
 
+    def getYPositions(self, data: List[Datapoint]) -> np.ndarray:
+        if data is self.data:
+            delay = self.groupDelay
+        elif data is self.reference:
+            delay = self.groupDelayReference
+        else:
+            return super().getYPositions(data)
+        if len(delay) != len(data):
+            return np.full(len(data), np.nan)
+        return self.topMargin + np.trunc(
+            (self.maxDelay - np.asarray(delay)) / self.span * self.dim.height)
+
+    def _view_key(self) -> tuple:
+        return super()._view_key() + (self.maxDelay,)
+
     def getYPositionFromDelay(self, delay: float) -> int:
         return self.topMargin + int(
             (self.maxDelay - delay) / self.span * self.dim.height)
@@ -19,13 +19,14 @@
 from dataclasses import dataclass
 import math
 import logging
-from typing import List
+from typing import List, Tuple
 
+import numpy as np
 from PyQt5 import QtGui
 
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.RFTools import Datapoint, from_datapoints
 from NanoVNASaver.SITools import log_floor_125
 
 logger = logging.getLogger(__name__)
@@ -80,39 +81,41 @@ class LogMagChart(FrequencyChart):
         self.drawMarkers(qp)
 
     def calc_scaling(self) -> None:
+        self.minValue, self.maxValue = self._cached(
+            "scaling", self._scaling_key(), self._find_scaling)
+
+    def _scaling_key(self) -> tuple:
+        return super()._scaling_key() + (self.isInverted,)
+
+    def _find_scaling(self) -> Tuple[float, float]:
         if self.fixedValues:
-            maxValue = self.maxDisplayValue
-            minValue = self.minDisplayValue
-        else:
-            # Find scaling
-            minValue = 100
-            maxValue = -100
-            for d in self.data:
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                maxValue = max(maxValue, logmag)
-                minValue = min(minValue, logmag)
-
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                maxValue = max(maxValue, logmag)
-                minValue = min(minValue, logmag)
-            minValue = 10 * math.floor(minValue / 10)
-            maxValue = 10 * math.ceil(maxValue / 10)
-
-        self.minValue = minValue
-        self.maxValue = maxValue
+            return self.minDisplayValue, self.maxDisplayValue
+        # Find scaling
+        minValue = 100
+        maxValue = -100
+        for d in self.data:
+            logmag = self.logMag(d)
+            if math.isinf(logmag):
+                continue
+            maxValue = max(maxValue, logmag)
+            minValue = min(minValue, logmag)
+
+        # Also check min/max for the reference sweep
+        for d in self.reference:
+            if d.freq < self.fstart or d.freq > self.fstop:
+                continue
+            logmag = self.logMag(d)
+            if math.isinf(logmag):
+                continue
+            maxValue = max(maxValue, logmag)
+            minValue = min(minValue, logmag)
+        return 10 * math.floor(minValue / 10), 10 * math.ceil(maxValue / 10)
 
     def draw_grid(self, qp):
         self.span = (self.maxValue - self.minValue) or 0.01
-        ticks = span2ticks(self.span, self.minValue)
-        self.draw_db_lines(qp, self.maxValue, self.minValue, ticks)
+        self.draw_db_lines(qp, self._cached(
+            "value_ticks", (self.minValue, self.maxValue, self.topMargin,
+                            self.dim.height), self._value_ticks))
 
         qp.setPen(QtGui.QPen(Chart.color.foreground))
         qp.drawLine(self.leftMargin - 5, self.topMargin,
@@ -123,18 +126,29 @@ class LogMagChart(FrequencyChart):
         self.drawFrequencyTicks(qp)
         self.draw_swr_markers(qp)
 
-    def draw_db_lines(self, qp, maxValue, minValue, ticks) -> None:
+    def _value_ticks(self) -> List[Tuple[int, str]]:
+        """y positions and labels of the dB lines, labels are empty at
+        the minimum and maximum"""
+        ticks = span2ticks(self.span, self.minValue)
+        lines = []
         for i in range(ticks.count):
             db = ticks.first + i * ticks.step
             y = self.topMargin + round(
-                (maxValue - db) / self.span * self.dim.height)
+                (self.maxValue - db) / self.span * self.dim.height)
+            label = ""
+            if db > self.minValue and db != self.maxValue:
+                label = f"{round(db, 1)}" if ticks.step < 1 else f"{db}"
+            lines.append((y, label))
+        return lines
+
+    def draw_db_lines(self, qp, lines: List[Tuple[int, str]]) -> None:
+        for y, label in lines:
             qp.setPen(QtGui.QPen(Chart.color.foreground))
             qp.drawLine(self.leftMargin - 5, y,
                         self.leftMargin + self.dim.width, y)
-            if db > minValue and db != maxValue:
+            if label:
                 qp.setPen(QtGui.QPen(Chart.color.text))
-                qp.drawText(3, y + 4,
-                            f"{round(db, 1)}" if ticks.step < 1 else f"{db}")
+                qp.drawText(3, y + 4, label)
 
     def draw_swr_markers(self, qp) -> None:
         qp.setPen(Chart.color.swr)
@@ -157,6 +171,18 @@ class LogMagChart(FrequencyChart):
         return self.topMargin + int(
             (self.maxValue - logMag) / self.span * self.dim.height)
 
+    def getYPositions(self, data: List[Datapoint]) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            logmag = 20 * np.log10(np.abs(from_datapoints(data)[1]))
+        if self.isInverted:
+            logmag = -logmag
+        return np.where(
+            np.isinf(logmag), self.topMargin, self.topMargin + np.trunc(
+                (self.maxValue - logmag) / self.span * self.dim.height))
+
+    def _view_key(self) -> tuple:
+        return super()._view_key() + (self.isInverted,)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxValue)
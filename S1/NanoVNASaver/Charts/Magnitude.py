@@ -1,10 +1,11 @@
 import math
 import logging
-from typing import List
+from typing import List, Tuple
 
+import numpy as np
 from PyQt5 import QtGui
 
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.RFTools import Datapoint, from_datapoints
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
 logger = logging.getLogger(__name__)
@@ -32,41 +33,18 @@ class MagnitudeChart(FrequencyChart):
         if self.bands.enabled:
             self.drawBands(qp, self.fstart, self.fstop)
 
-        if self.fixedValues:
-            max_value = self.maxDisplayValue
-            min_value = self.minDisplayValue
-        else:
-            # Find scaling
-            min_value = 100
-            max_value = 0
-            for d in self.data:
-                mag = self.magnitude(d)
-                max_value = max(max_value, mag)
-                min_value = min(min_value, mag)
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                max_value = max(max_value, mag)
-                min_value = min(min_value, mag)
-            min_value = 10 * math.floor(min_value / 10)
-            max_value = 10 * math.ceil(max_value / 10)
-
+        min_value, max_value = self._cached(
+            "scaling", self._scaling_key(), self._find_scaling)
         self.maxValue = max_value
         self.minValue = min_value
 
         self.span = (max_value - min_value) or 0.01
 
-        target_ticks = int(self.dim.height // 60)
-        for i in range(target_ticks):
-            val = min_value + i / target_ticks * self.span
-            y = self.topMargin + int((self.maxValue - val) / self.span
-                                     * self.dim.height)
+        for y, vswrstr in self._cached(
+                "value_ticks", (min_value, max_value, self.topMargin,
+                                self.dim.height), self._value_ticks):
             qp.setPen(Chart.color.text)
-            if val != min_value:
-                digits = max(0, min(2, math.floor(3 - math.log10(abs(val)))))
-                vswrstr = (str(round(val)) if digits == 0 else
-                           str(round(val, digits)))
+            if vswrstr:
                 qp.drawText(3, y + 3, vswrstr)
             qp.setPen(QtGui.QPen(Chart.color.foreground))
             qp.drawLine(self.leftMargin - 5, y,
@@ -95,11 +73,50 @@ class MagnitudeChart(FrequencyChart):
         self.drawData(qp, self.reference, Chart.color.reference)
         self.drawMarkers(qp)
 
+    def _find_scaling(self) -> Tuple[float, float]:
+        if self.fixedValues:
+            return self.minDisplayValue, self.maxDisplayValue
+        # Find scaling
+        min_value = 100
+        max_value = 0
+        for d in self.data:
+            mag = self.magnitude(d)
+            max_value = max(max_value, mag)
+            min_value = min(min_value, mag)
+        # Also check min/max for the reference sweep
+        for d in self.reference:
+            if d.freq < self.fstart or d.freq > self.fstop:
+                continue
+            mag = self.magnitude(d)
+            max_value = max(max_value, mag)
+            min_value = min(min_value, mag)
+        return 10 * math.floor(min_value / 10), 10 * math.ceil(max_value / 10)
+
+    def _value_ticks(self) -> List[Tuple[int, str]]:
+        target_ticks = int(self.dim.height // 60)
+        ticks = []
+        for i in range(target_ticks):
+            val = self.minValue + i / target_ticks * self.span
+            y = self.topMargin + int((self.maxValue - val) / self.span
+                                     * self.dim.height)
+            vswrstr = ""
+            if val != self.minValue:
+                digits = max(0, min(2, math.floor(3 - math.log10(abs(val)))))
+                vswrstr = (str(round(val)) if digits == 0 else
+                           str(round(val, digits)))
+            ticks.append((y, vswrstr))
+        return ticks
+
     def getYPosition(self, d: Datapoint) -> int:
         mag = self.magnitude(d)
         return self.topMargin + int(
             (self.maxValue - mag) / self.span * self.dim.height)
 
+    def getYPositions(self, data: List[Datapoint]) -> np.ndarray:
+        mag = np.abs(from_datapoints(data)[1])
+        return self.topMargin + np.trunc(
+            (self.maxValue - mag) / self.span * self.dim.height)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxValue)
@@ -19,12 +19,12 @@
 import math
 import logging
 
-from typing import List
+from typing import List, Tuple
 import numpy as np
 
 from PyQt5 import QtWidgets, QtGui
 
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.RFTools import Datapoint, from_datapoints
 from NanoVNASaver.Charts.Chart import Chart
 from NanoVNASaver.Charts.Frequency import FrequencyChart
 
@@ -67,24 +67,9 @@ class PhaseChart(FrequencyChart):
         if len(self.data) == 0 and len(self.reference) == 0:
             return
 
-        if self.unwrap:
-            rawData = [d.phase for d in self.data]
-            rawReference = [d.phase for d in self.reference]
-            self.unwrappedData = np.degrees(np.unwrap(rawData))
-            self.unwrappedReference = np.degrees(np.unwrap(rawReference))
-
-        if self.fixedValues:
-            minAngle = self.minDisplayValue
-            maxAngle = self.maxDisplayValue
-        elif self.unwrap and self.data:
-            minAngle = math.floor(np.min(self.unwrappedData))
-            maxAngle = math.ceil(np.max(self.unwrappedData))
-        elif self.unwrap and self.reference:
-            minAngle = math.floor(np.min(self.unwrappedReference))
-            maxAngle = math.ceil(np.max(self.unwrappedReference))
-        else:
-            minAngle = -180
-            maxAngle = 180
+        (minAngle, maxAngle, self.unwrappedData,
+         self.unwrappedReference) = self._cached(
+            "scaling", self._scaling_key(), self._find_scaling)
 
         span = maxAngle - minAngle
         if span == 0:
@@ -93,25 +78,14 @@ class PhaseChart(FrequencyChart):
         self.maxAngle = maxAngle
         self.span = span
 
-        tickcount = math.floor(self.dim.height / 60)
-
-        for i in range(tickcount):
-            angle = minAngle + span * i / tickcount
-            y = self.topMargin + int(
-                (self.maxAngle - angle) / self.span * self.dim.height)
-            if angle not in [minAngle, maxAngle]:
-                qp.setPen(QtGui.QPen(Chart.color.text))
-                if angle != 0:
-                    digits = max(
-                        0, min(2, math.floor(3 - math.log10(abs(angle)))))
-                    anglestr = str(round(angle)) if digits == 0 else str(
-                        round(angle, digits))
-                else:
-                    anglestr = "0"
-                qp.drawText(3, y + 3, f"{anglestr}°")
-                qp.setPen(QtGui.QPen(Chart.color.foreground))
-                qp.drawLine(self.leftMargin - 5, y,
-                            self.leftMargin + self.dim.width, y)
+        for y, anglestr in self._cached(
+                "value_ticks", (minAngle, maxAngle, self.topMargin,
+                                self.dim.height), self._value_ticks):
+            qp.setPen(QtGui.QPen(Chart.color.text))
+            qp.drawText(3, y + 3, anglestr)
+            qp.setPen(QtGui.QPen(Chart.color.foreground))
+            qp.drawLine(self.leftMargin - 5, y,
+                        self.leftMargin + self.dim.width, y)
         qp.drawLine(self.leftMargin - 5,
                     self.topMargin,
                     self.leftMargin + self.dim.width,
@@ -131,6 +105,53 @@ class PhaseChart(FrequencyChart):
         self.drawData(qp, self.reference, Chart.color.reference)
         self.drawMarkers(qp)
 
+    def _scaling_key(self) -> tuple:
+        return super()._scaling_key() + (self.unwrap,)
+
+    def _find_scaling(self) -> Tuple[int, int, np.ndarray, np.ndarray]:
+        """angle range, unwrapped data and reference phases"""
+        unwrappedData = unwrappedReference = np.empty(0)
+        if self.unwrap:
+            rawData = [d.phase for d in self.data]
+            rawReference = [d.phase for d in self.reference]
+            unwrappedData = np.degrees(np.unwrap(rawData))
+            unwrappedReference = np.degrees(np.unwrap(rawReference))
+
+        if self.fixedValues:
+            minAngle = self.minDisplayValue
+            maxAngle = self.maxDisplayValue
+        elif self.unwrap and self.data:
+            minAngle = math.floor(np.min(unwrappedData))
+            maxAngle = math.ceil(np.max(unwrappedData))
+        elif self.unwrap and self.reference:
+            minAngle = math.floor(np.min(unwrappedReference))
+            maxAngle = math.ceil(np.max(unwrappedReference))
+        else:
+            minAngle = -180
+            maxAngle = 180
+        return minAngle, maxAngle, unwrappedData, unwrappedReference
+
+    def _value_ticks(self) -> List[Tuple[int, str]]:
+        """y positions and labels of the ticks between the minimum and
+        maximum angle"""
+        tickcount = math.floor(self.dim.height / 60)
+        ticks = []
+        for i in range(tickcount):
+            angle = self.minAngle + self.span * i / tickcount
+            if angle in [self.minAngle, self.maxAngle]:
+                continue
+            y = self.topMargin + int(
+                (self.maxAngle - angle) / self.span * self.dim.height)
+            if angle != 0:
+                digits = max(
+                    0, min(2, math.floor(3 - math.log10(abs(angle)))))
+                anglestr = str(round(angle)) if digits == 0 else str(
+                    round(angle, digits))
+            else:
+                anglestr = "0"
+            ticks.append((y, f"{anglestr}°"))
+        return ticks
+
     def getYPosition(self, d: Datapoint) -> int:
         if self.unwrap and d in self.data:
             angle = self.unwrappedData[self.data.index(d)]
@@ -141,6 +162,19 @@ class PhaseChart(FrequencyChart):
         return self.topMargin + int(
             (self.maxAngle - angle) / self.span * self.dim.height)
 
+    def getYPositions(self, data: List[Datapoint]) -> np.ndarray:
+        if self.unwrap and data is self.data:
+            angle = self.unwrappedData
+        elif self.unwrap and data is self.reference:
+            angle = self.unwrappedReference
+        else:
+            angle = np.degrees(np.angle(from_datapoints(data)[1]))
+        return self.topMargin + np.trunc(
+            (self.maxAngle - angle) / self.span * self.dim.height)
+
+    def _view_key(self) -> tuple:
+        return super()._view_key() + (self.unwrap, self.maxAngle)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.dim.height * self.span) - self.maxAngle)
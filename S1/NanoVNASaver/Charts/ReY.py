@@ -18,11 +18,12 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import math
 import logging
-from typing import List
+from typing import List, Tuple
 
+import numpy as np
 from PyQt5 import QtGui
 
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.RFTools import Datapoint, from_datapoints
 from NanoVNASaver.SITools import (
     Format, Value, round_ceil, round_floor)
 from NanoVNASaver.Charts.Chart import Chart
@@ -54,53 +55,22 @@ class ReYChart(FrequencyChart):
         if self.bands.enabled:
             self.drawBands(qp, self.fstart, self.fstop)
 
-        if self.fixedValues:
-            self.maxValue = self.maxDisplayValue
-            self.minValue = (
-                max(self.minDisplayValue, 0.01) if self.logarithmicY else
-                self.minDisplayValue)
-        else:
-            # Find scaling
-            self.minValue = 100
-            self.maxValue = 0
-            for d in self.data:
-                mag = self.magnitude(d)
-                if math.isinf(mag):  # Avoid infinite scales
-                    continue
-                self.maxValue = max(self.maxValue, mag)
-                self.minValue = min(self.minValue, mag)
-            # Also check min/max for the reference sweep
-            for d in self.reference:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                mag = self.magnitude(d)
-                if math.isinf(mag):  # Avoid infinite scales
-                    continue
-                self.maxValue = max(self.maxValue, mag)
-                self.minValue = min(self.minValue, mag)
-
-            self.minValue = round_floor(self.minValue, 2)
-            if self.logarithmicY and self.minValue <= 0:
-                self.minValue = 0.01
-            self.maxValue = round_ceil(self.maxValue, 2)
-
+        self.minValue, self.maxValue = self._cached(
+            "scaling", self._scaling_key(), self._find_scaling)
         self.span = (self.maxValue - self.minValue) or 0.01
 
-        # We want one horizontal tick per 50 pixels, at most
-        horizontal_ticks = int(self.dim.height / 50)
-        fmt = Format(max_nr_digits=4)
-        for i in range(horizontal_ticks):
-            y = self.topMargin + round(i * self.dim.height / horizontal_ticks)
+        ticks, min_label = self._cached(
+            "value_ticks", (self.minValue, self.maxValue, self.logarithmicY,
+                            self.topMargin, self.dim.height),
+            self._value_axis)
+        for y, label in ticks:
             qp.setPen(QtGui.QPen(Chart.color.foreground))
             qp.drawLine(self.leftMargin - 5, y,
                         self.leftMargin + self.dim.width + 5, y)
             qp.setPen(QtGui.QPen(Chart.color.text))
-            val = Value(self.valueAtPosition(y)[0], fmt=fmt)
-            qp.drawText(3, y + 4, str(val))
+            qp.drawText(3, y + 4, label)
 
-        qp.drawText(3,
-                    self.dim.height + self.topMargin,
-                    str(Value(self.minValue, fmt=fmt)))
+        qp.drawText(3, self.dim.height + self.topMargin, min_label)
 
         self.drawFrequencyTicks(qp)
 
@@ -108,6 +78,46 @@ class ReYChart(FrequencyChart):
         self.drawData(qp, self.reference, Chart.color.reference)
         self.drawMarkers(qp)
 
+    def _find_scaling(self) -> Tuple[float, float]:
+        if self.fixedValues:
+            return (max(self.minDisplayValue, 0.01) if self.logarithmicY
+                    else self.minDisplayValue), self.maxDisplayValue
+        # Find scaling
+        min_value = 100
+        max_value = 0
+        for d in self.data:
+            mag = self.magnitude(d)
+            if math.isinf(mag):  # Avoid infinite scales
+                continue
+            max_value = max(max_value, mag)
+            min_value = min(min_value, mag)
+        # Also check min/max for the reference sweep
+        for d in self.reference:
+            if d.freq < self.fstart or d.freq > self.fstop:
+                continue
+            mag = self.magnitude(d)
+            if math.isinf(mag):  # Avoid infinite scales
+                continue
+            max_value = max(max_value, mag)
+            min_value = min(min_value, mag)
+
+        min_value = round_floor(min_value, 2)
+        if self.logarithmicY and min_value <= 0:
+            min_value = 0.01
+        return min_value, round_ceil(max_value, 2)
+
+    def _value_axis(self) -> Tuple[List[Tuple[int, str]], str]:
+        """y positions and labels of the value ticks, label of the
+        minimum"""
+        # We want one horizontal tick per 50 pixels, at most
+        horizontal_ticks = int(self.dim.height / 50)
+        fmt = Format(max_nr_digits=4)
+        ticks = []
+        for i in range(horizontal_ticks):
+            y = self.topMargin + round(i * self.dim.height / horizontal_ticks)
+            ticks.append((y, str(Value(self.valueAtPosition(y)[0], fmt=fmt))))
+        return ticks, str(Value(self.minValue, fmt=fmt))
+
     def getYPosition(self, d: Datapoint) -> int:
         mag = self.magnitude(d)
         if self.logarithmicY and mag == 0:
@@ -122,6 +132,22 @@ class ReYChart(FrequencyChart):
                 (self.maxValue - mag) / self.span * self.dim.height)
         return self.topMargin
 
+    def getYPositions(self, data: List[Datapoint]) -> np.ndarray:
+        gamma = from_datapoints(data)[1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # conductance of the 50 Ohm impedance of gamma
+            mag = ((1 - gamma) / (50 * (1 + gamma))).real
+            if self.logarithmicY:
+                span = math.log(self.maxValue) - math.log(self.minValue)
+                y = self.topMargin + np.trunc(
+                    (math.log(self.maxValue) - np.log(mag)) /
+                    span * self.dim.height)
+                y[mag == 0] = self.topMargin - self.dim.height
+            else:
+                y = self.topMargin + np.trunc(
+                    (self.maxValue - mag) / self.span * self.dim.height)
+        return np.where(np.isfinite(mag), y, self.topMargin)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         if self.logarithmicY:
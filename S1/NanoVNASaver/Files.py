@@ -76,27 +76,27 @@ class FilesWindow(QtWidgets.QWidget):
             logger.debug("No file name selected.")
             return
 
-        if self.sweep.properties.mode == SweepMode.CONTINOUS:
+        if self.sweep.properties.mode.continuous:
             letra = "x"
             posf = filename.rfind('B')
-            print(len(self.app.worker.alls21))
-
-            for i in range (0,len(self.app.worker.alls11)) :
-                faux = filename[:posf]+str(i)+letra+filename[posf:]
+            history = self.app.worker.history
+            if history.dropped:
+                logger.warning("Only the last %d sweeps are kept, the first"
+                               " %d are in the sweep store", len(history),
+                               history.dropped)
+
+            for i in range (0,len(history)) :
+                n = history.dropped + i
+                faux = filename[:posf]+str(n)+letra+filename[posf:]
                 ts = Touchstone(faux)
-                print(faux)
-                ts.sdata[0] = self.app.worker.alls11[i]
-                ts.sdata[1] = self.app.worker.alls21[i]
+                logger.debug("Saving %s", faux)
+                ts.sdata[0], ts.sdata[1] = history.datapoints(i)
 
-                for dp in self.app.worker.alls11[i]:
+                for dp in ts.sdata[0]:
                     ts.sdata[2].append(Datapoint(dp.freq, 0, 0))
                     ts.sdata[3].append(Datapoint(dp.freq, 0, 0))
-
-                print(i)
                 ts.save(4)
 
-                print(self.app.worker.alls21[i])
-
         if self.sweep.properties.mode == SweepMode.SINGLE:
 
                 ts = Touchstone(filename)
@@ -0,0 +1,221 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Record and replay the traffic of a serial interface
+
+A capture file starts with MAGIC and the interface comment terminated by
+a newline, followed by one record per transfer: a little endian header
+of timestamp (float64 seconds since open), direction (TX or RX) and
+payload length (uint32), then the payload itself. Every open of the
+interface starts with an empty OPEN record, so a reconnect is appended
+to the capture as a new session.
+"""
+import logging
+import os
+import re
+from struct import Struct
+from threading import Lock, Thread, current_thread
+from time import monotonic, sleep
+from typing import BinaryIO, List, NamedTuple, Set, Tuple
+
+from NanoVNASaver.Hardware.Serial import Interface
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NVSCAP1 "
+TX = 0
+RX = 1
+OPEN = 2
+_RECORD = Struct("<dBI")
+# capture files started by this process, later opens append to them
+_started: Set[str] = set()
+_started_lock = Lock()
+
+
+class Transfer(NamedTuple):
+    time: float
+    direction: int
+    data: bytes
+
+
+def read_capture(filename: str) -> Tuple[str, List[Transfer]]:
+    """read comment and transfers of a capture file"""
+    with open(filename, "rb") as file:
+        header = file.readline()
+        if not header.startswith(MAGIC):
+            raise IOError(f"{filename} is not a capture file")
+        comment = header[len(MAGIC):].decode("utf-8").rstrip("\n")
+        transfers = []
+        while head := file.read(_RECORD.size):
+            if len(head) < _RECORD.size:
+                logger.warning("Truncated capture file %s", filename)
+                break
+            time, direction, length = _RECORD.unpack(head)
+            transfers.append(Transfer(time, direction, file.read(length)))
+    return comment, transfers
+
+
+def capture_filename(capture: str, port: str) -> str:
+    """capture file of the device on port, e.g. sweep_ttyACM0.cap"""
+    root, ext = os.path.splitext(capture)
+    device = re.sub(r"\W+", "_", os.path.basename(port))
+    return f"{root}_{device}{ext}"
+
+
+def split_sessions(transfers: List[Transfer]) -> List[List[Transfer]]:
+    """transfers of every open of the recorded interface"""
+    sessions = [[]]
+    for transfer in transfers:
+        if transfer.direction == OPEN:
+            sessions.append([])
+        else:
+            sessions[-1].append(transfer)
+    # a capture without OPEN records is a single session
+    return sessions[1:] if len(sessions) > 1 else sessions
+
+
+class RecordingInterface(Interface):
+    """serial interface writing all traffic to a capture file"""
+
+    def __init__(self, interface_type: str, comment, capture: str,
+                 *args, **kwargs):
+        super().__init__(interface_type, comment, *args, **kwargs)
+        self.capture = capture
+        self._file: BinaryIO = None
+        self._file_lock = Lock()
+        self._t_open = 0.0
+
+    def open(self):
+        with self._file_lock:
+            with _started_lock:
+                new = self.capture not in _started
+                _started.add(self.capture)
+            self._file = open(self.capture, "wb" if new else "ab")
+            if new:
+                self._file.write(
+                    MAGIC + f"{self.comment}\n".encode("utf-8"))
+            self._t_open = monotonic()
+        self._record(OPEN, b"")
+        super().open()
+
+    def close(self):
+        super().close()
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _record(self, direction: int, data: bytes):
+        with self._file_lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(
+                monotonic() - self._t_open, direction, len(data)))
+            self._file.write(data)
+
+    def _received(self, data: bytes):
+        self._record(RX, data)
+        super()._received(data)
+
+    def write(self, data: bytes) -> int:
+        self._record(TX, bytes(data))
+        return super().write(data)
+
+
+class ReplayInterface(Interface):
+    """serial interface answering from a capture file
+
+    Received data is released once the driver has written everything
+    that was sent before it in the capture, either immediately or after
+    the recorded delay if paced is set. Every open replays the next
+    recorded session.
+    """
+
+    def __init__(self, capture: str, paced: bool = False):
+        comment, transfers = read_capture(capture)
+        super().__init__('serial', comment)
+        self.port = capture
+        self.paced = paced
+        self.sessions = split_sessions(transfers)
+        self._session = 0
+        self.transfers: List[Transfer] = []
+        self._written = bytearray()
+        self._sent = b""
+
+    def open(self):
+        if self._session < len(self.sessions):
+            self.transfers = self.sessions[self._session]
+            self._session += 1
+        else:
+            logger.warning("No more sessions in %s", self.port)
+            self.transfers = []
+        self._sent = b"".join(
+            t.data for t in self.transfers if t.direction == TX)
+        self._rx.clear()
+        self._written.clear()
+        self.is_open = True
+        self._reader = Thread(target=self._read_port,
+                              name=f"replay {self.port}", daemon=True)
+        self._reader.start()
+
+    def close(self):
+        reader, self._reader = self._reader, None
+        with self._rx_ready:
+            self._rx_ready.notify_all()
+        if reader is not None and reader is not current_thread():
+            reader.join()
+        self.is_open = False
+
+    def _read_port(self):
+        expected = 0
+        t_sync, t_recorded = monotonic(), 0.0
+        for transfer in self.transfers:
+            if self._reader is not current_thread():
+                return
+            if transfer.direction == TX:
+                expected += len(transfer.data)
+                with self._rx_ready:
+                    while (len(self._written) < expected and
+                           self._reader is current_thread()):
+                        self._rx_ready.wait()
+                t_sync, t_recorded = monotonic(), transfer.time
+                continue
+            if self.paced:
+                sleep(max(0.0, t_sync + transfer.time - t_recorded -
+                          monotonic()))
+            self._received(transfer.data)
+        logger.info("Replay of %s finished", self.port)
+
+    def write(self, data: bytes) -> int:
+        offset = len(self._written)
+        if self._sent[offset:offset + len(data)] != bytes(data):
+            logger.warning("Replay of %s diverged at byte %d",
+                           self.port, offset)
+        with self._rx_ready:
+            self._written += data
+            self._rx_ready.notify_all()
+        return len(data)
+
+    def _reconfigure_port(self, *args, **kwargs):
+        pass
+
+    def reset_input_buffer(self):
+        with self._rx_ready:
+            self._rx.clear()
+
+    def reset_output_buffer(self):
+        pass
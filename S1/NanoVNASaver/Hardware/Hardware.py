@@ -35,7 +35,11 @@ from NanoVNASaver.Hardware.NanoVNA_H import NanoVNA_H
 from NanoVNASaver.Hardware.NanoVNA_H4 import NanoVNA_H4
 from NanoVNASaver.Hardware.NanoVNA_V2 import NanoVNA_V2
 from NanoVNASaver.Hardware.TinySA import TinySA
+from NanoVNASaver.Hardware.Simulator import (
+    Simulator, Simulator_V2, SIMULATORS, simulator_interface)
 from NanoVNASaver.Hardware.Serial import drain_serial, Interface
+from NanoVNASaver.Hardware.Capture import (
+    RecordingInterface, ReplayInterface, capture_filename)
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +54,12 @@ USBDEVICETYPES = (
 RETRIES = 3
 TIMEOUT = 0.2
 WAIT = 0.05
+# offer simulated devices in get_interfaces()
+SIMULATE = False
+# record device traffic to one capture file per device, named after
+# RECORD and the port / offer a device replaying this capture file
+RECORD = ""
+REPLAY = ""
 
 NAME2DEVICE = {
     "S-A-A-2": NanoVNA_V2,
@@ -60,6 +70,8 @@ NAME2DEVICE = {
     "F": NanoVNA_F,
     "NanoVNA": NanoVNA,
     "tinySA": TinySA,
+    "Simulator": Simulator,
+    "Simulator-V2": Simulator_V2,
     "Unknown": NanoVNA,
 }
 
@@ -100,8 +112,18 @@ def get_interfaces() -> List[Interface]:
         iface.open()
         iface.comment = get_comment(iface)
         iface.close()
+        if RECORD:
+            # record from the first real connect on, not this probe
+            iface = RecordingInterface(
+                'serial', iface.comment, capture_filename(RECORD, d.device))
+            iface.port = d.device
         interfaces.append(iface)
 
+    if SIMULATE:
+        interfaces.extend(simulator_interface(name) for name in SIMULATORS)
+    if REPLAY:
+        interfaces.append(ReplayInterface(REPLAY))
+
     logger.debug("Interfaces: %s", interfaces)
     return interfaces
 
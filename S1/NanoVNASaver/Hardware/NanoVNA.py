@@ -7,7 +7,7 @@ import numpy as np
 from PyQt5 import QtGui
 
 from NanoVNASaver.Hardware.Serial import drain_serial, Interface
-from NanoVNASaver.Hardware.VNA import VNA
+from NanoVNASaver.Hardware.VNA import VNA, parse_values
 #from NanoVNASaver.Hardware.TControl import TControl
 from NanoVNASaver.Version import Version
 
@@ -26,7 +26,7 @@ class NanoVNA(VNA):
         logger.debug("Setting initial start,stop")
         self.start, self.stop = self._get_running_frequencies()
         self.sweep_max_freq_Hz = 300e6
-        self._sweepdata = []
+        self._sweepdata = np.empty((0, 2), dtype=np.complex128)
 
     def _get_running_frequencies(self):
 
@@ -114,19 +114,20 @@ class NanoVNA(VNA):
     def readValues(self, value) -> List[str]:
         if self.sweep_method != "scan_mask":
             return super().readValues(value)
+        return [f"{x.real} {x.imag}"
+                for x in self.readValuesArray(value).tolist()]
+
+    def readValuesArray(self, value) -> np.ndarray:
+        if self.sweep_method != "scan_mask":
+            values = parse_values(self.exec_command_block(value), 2)
+            return values[:, 0] + 1j * values[:, 1]
         logger.debug("readValue with scan mask (%s)", value)
         # Actually grab the data only when requesting channel 0.
         # The hardware will return all channels which we will store.
         if value == "data 0":
-            self._sweepdata = []
-            for line in self.exec_command(
-                    f"scan {self.start} {self.stop} {self.datapoints} 0b110"):
-                data = line.split()
-                self._sweepdata.append((
-                    f"{data[0]} {data[1]}",
-                    f"{data[2]} {data[3]}"))
-        if value == "data 0":
-            return [x[0] for x in self._sweepdata]
+            values = parse_values(self.exec_command_block(
+                f"scan {self.start} {self.stop} {self.datapoints} 0b110"), 4)
+            self._sweepdata = values[:, 0::2] + 1j * values[:, 1::2]
         if value == "data 1":
-            return [x[1] for x in self._sweepdata]
-
+            return self._sweepdata[:, 1]
+        return self._sweepdata[:, 0]
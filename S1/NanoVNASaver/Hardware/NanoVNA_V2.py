@@ -1,10 +1,12 @@
 
 import logging
 import platform
-from struct import pack, unpack_from
+from struct import pack
 from time import sleep
 from typing import List
 
+import numpy as np
+
 from NanoVNASaver.Hardware.Serial import Interface
 from NanoVNASaver.Hardware.VNA import VNA
 from NanoVNASaver.Version import Version
@@ -49,6 +51,14 @@ _ADF4350_TXPOWER_DESC_MAP = {
 _ADF4350_TXPOWER_DESC_REV_MAP = {
     value: key for key, value in _ADF4350_TXPOWER_DESC_MAP.items()}
 
+# one 32 byte FIFO record
+_FIFO_RECORD = np.dtype([
+    ("fwd_real", "<i4"), ("fwd_imag", "<i4"),
+    ("rev0_real", "<i4"), ("rev0_imag", "<i4"),
+    ("rev1_real", "<i4"), ("rev1_imag", "<i4"),
+    ("freq_index", "<i2"), ("reserved", "V6"),
+])
+
 
 class NanoVNA_V2(VNA):
     name = "NanoVNA-V2"
@@ -59,7 +69,8 @@ class NanoVNA_V2(VNA):
     def __init__(self, iface: Interface):
         super().__init__(iface)
 
-        if platform.system() != 'Windows':
+        if (platform.system() != 'Windows' and
+                getattr(self.serial, "fd", None) is not None):
             tty.setraw(self.serial.fd)
 
         # reset protocol to known state
@@ -77,7 +88,7 @@ class NanoVNA_V2(VNA):
         self.sweepStartHz = 200e6
         self.sweepStepHz = 1e6
 
-        self._sweepdata = []
+        self._sweepdata = np.zeros((0, 2), dtype=np.complex128)
         self._updateSweep()
 
     def getCalibration(self) -> str:
@@ -115,22 +126,17 @@ class NanoVNA_V2(VNA):
         ]
 
     def _read_pointstoread(self, pointstoread, arr) -> None:
-        freq_index = -1
-
-        for i in range(pointstoread):
-            (fwd_real, fwd_imag, rev0_real, rev0_imag, rev1_real,
-             rev1_imag, freq_index) = unpack_from(
-                "<iiiiiihxxxxxx", arr, i * 32)
-            fwd = complex(fwd_real, fwd_imag)
-            refl = complex(rev0_real, rev0_imag)
-            thru = complex(rev1_real, rev1_imag)
-            if i == 0:
-                logger.debug("Freq index from: %i", freq_index)
-            self._sweepdata[freq_index] = (refl / fwd, thru / fwd)
-
-        logger.debug("Freq index to: %i", freq_index)
-
-    def readValues(self, value) -> List[str]:
+        records = np.frombuffer(arr, dtype=_FIFO_RECORD, count=pointstoread)
+        fwd = records["fwd_real"] + 1j * records["fwd_imag"]
+        refl = records["rev0_real"] + 1j * records["rev0_imag"]
+        thru = records["rev1_real"] + 1j * records["rev1_imag"]
+        freq_index = records["freq_index"]
+        logger.debug("Freq index from: %i", freq_index[0])
+        self._sweepdata[freq_index, 0] = refl / fwd
+        self._sweepdata[freq_index, 1] = thru / fwd
+        logger.debug("Freq index to: %i", freq_index[-1])
+
+    def readValuesArray(self, value) -> np.ndarray:
         # Actually grab the data only when requesting channel 0.
         # The hardware will return all channels which we will store.
         if value == "data 0":
@@ -145,8 +151,8 @@ class NanoVNA_V2(VNA):
                                        _CMD_WRITE, _ADDR_VALUES_FIFO, 0))
                 sleep(WRITE_SLEEP)
                 # clear sweepdata
-                self._sweepdata = [(complex(), complex())] * (
-                    self.datapoints + s21hack)
+                self._sweepdata = np.zeros(
+                    (self.datapoints + s21hack, 2), dtype=np.complex128)
                 pointstodo = self.datapoints + s21hack
                 # we read at most 255 values at a time and the time required
                 # empirically is just over 3 seconds for 101 points or
@@ -176,7 +182,8 @@ class NanoVNA_V2(VNA):
                         if nBytes > len(arr):
                             arr = arr + self.serial.read(nBytes - len(arr))
                     if nBytes != len(arr):
-                        return []
+                        self.serial.timeout = timeout
+                        return np.empty(0, dtype=np.complex128)
 
                     self._read_pointstoread(pointstoread, arr)
 
@@ -187,10 +194,11 @@ class NanoVNA_V2(VNA):
                 self._sweepdata = self._sweepdata[1:]
 
         idx = 1 if value == "data 1" else 0
-        return [
-            f'{str(x[idx].real)} {str(x[idx].imag)}'
-            for x in self._sweepdata
-        ]
+        return self._sweepdata[:, idx]
+
+    def readValues(self, value) -> List[str]:
+        return [f'{x.real} {x.imag}'
+                for x in self.readValuesArray(value).tolist()]
 
     def resetSweep(self, start: int, stop: int):
         self.setSweep(start, stop)
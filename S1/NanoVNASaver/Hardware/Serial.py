@@ -1,7 +1,8 @@
 import logging
-from threading import Lock
+from threading import Condition, Lock, Thread, current_thread
 
 import serial
+from serial.serialutil import Timeout
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +10,8 @@ logger = logging.getLogger(__name__)
 def drain_serial(serial_port: serial.Serial):
     """drain up to 64k outstanding data in the serial incoming buffer"""
     # logger.debug("Draining: %s", serial_port)
+    # with a reader thread the reads wait on its buffer, so this still
+    # waits until the line is quiet for 50 ms
     timeout = serial_port.timeout
     serial_port.timeout = 0.05
     for _ in range(512):
@@ -22,6 +25,11 @@ def drain_serial(serial_port: serial.Serial):
 
 class Interface(serial.Serial):
     def __init__(self, interface_type: str, comment, *args, **kwargs):
+        self._rx = bytearray()
+        self._rx_ready = Condition()
+        self._reader = None
+        # exception that stopped the reader thread
+        self._error = None
         super().__init__(*args, **kwargs)
         assert interface_type in {'serial', 'usb', 'bt', 'network'}
         self.type = interface_type
@@ -33,3 +41,106 @@ class Interface(serial.Serial):
 
     def __str__(self):
         return f"{self.port} ({self.comment})"
+
+    @property
+    def reading(self) -> bool:
+        return self._reader is not None
+
+    def open(self):
+        super().open()
+        self._rx.clear()
+        self._error = None
+        self._reader = Thread(target=self._read_port,
+                              name=f"serial reader {self.port}",
+                              daemon=True)
+        self._reader.start()
+
+    def close(self):
+        reader, self._reader = self._reader, None
+        if reader is not None and reader is not current_thread():
+            self.cancel_read()
+            reader.join()
+        super().close()
+
+    def _read_port(self):
+        """move incoming data into the receive buffer and wake up waiters"""
+        while self._reader is current_thread():
+            try:
+                data = super().read(max(1, super().in_waiting))
+            except (serial.SerialException, OSError, TypeError) as exc:
+                logger.warning("Serial reader stopped: %s", exc)
+                with self._rx_ready:
+                    self._error = exc
+                    if self._reader is current_thread():
+                        self._reader = None
+                break
+            if data:
+                self._received(data)
+        with self._rx_ready:
+            self._rx_ready.notify_all()
+
+    def _received(self, data: bytes):
+        with self._rx_ready:
+            self._rx += data
+            self._rx_ready.notify_all()
+
+    def _check_error(self):
+        """raise the error that stopped the reader thread"""
+        if self._error is not None:
+            raise serial.SerialException(
+                f"{self.port}: {self._error}") from self._error
+
+    def _take(self, count: int) -> bytes:
+        data = bytes(self._rx[:count])
+        del self._rx[:count]
+        return data
+
+    @property
+    def in_waiting(self) -> int:
+        if not self.reading:
+            return super().in_waiting
+        return len(self._rx)
+
+    def read(self, size: int = 1) -> bytes:
+        if not self.reading:
+            self._check_error()
+            return super().read(size)
+        timeout = Timeout(self.timeout)
+        with self._rx_ready:
+            while (len(self._rx) < size and self.reading and
+                   not timeout.expired()):
+                self._rx_ready.wait(timeout.time_left())
+            if len(self._rx) < size:
+                self._check_error()
+            return self._take(size)
+
+    def read_until(self, expected: bytes = serial.LF,
+                   size: int = None) -> bytes:
+        if not self.reading:
+            self._check_error()
+            return super().read_until(expected, size)
+        timeout = Timeout(self.timeout)
+        with self._rx_ready:
+            while True:
+                end = self._rx.find(expected)
+                if end >= 0:
+                    end += len(expected)
+                elif size is not None and len(self._rx) >= size:
+                    end = size
+                elif timeout.expired() or not self.reading:
+                    self._check_error()
+                    end = len(self._rx)
+                else:
+                    self._rx_ready.wait(timeout.time_left())
+                    continue
+                return self._take(end if size is None else min(end, size))
+
+    def readline(self, size: int = -1) -> bytes:
+        if not self.reading:
+            return super().readline(size)
+        return self.read_until(serial.LF, None if size < 0 else size)
+
+    def reset_input_buffer(self):
+        super().reset_input_buffer()
+        with self._rx_ready:
+            self._rx.clear()
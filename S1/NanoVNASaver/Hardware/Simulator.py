@@ -0,0 +1,274 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import os
+import platform
+from threading import Thread
+from time import monotonic, sleep
+from typing import Dict, List
+
+import numpy as np
+
+from NanoVNASaver.Hardware.NanoVNA import NanoVNA
+from NanoVNASaver.Hardware.NanoVNA_V2 import (
+    NanoVNA_V2, _FIFO_RECORD,
+    _CMD_NOP, _CMD_INDICATE, _CMD_READ, _CMD_READ2, _CMD_READ4,
+    _CMD_READFIFO, _CMD_WRITE, _CMD_WRITE2, _CMD_WRITE4, _CMD_WRITE8,
+    _CMD_WRITEFIFO, _ADDR_SWEEP_START, _ADDR_SWEEP_STEP, _ADDR_SWEEP_POINTS,
+    _ADDR_VALUES_FIFO, _ADDR_DEVICE_VARIANT, _ADDR_PROTOCOL_VERSION,
+    _ADDR_HARDWARE_REVISION, _ADDR_FW_MAJOR, _ADDR_FW_MINOR)
+from NanoVNASaver.Hardware.Serial import Interface
+
+if platform.system() != 'Windows':
+    import tty
+
+logger = logging.getLogger(__name__)
+
+# bytes following each V2 command byte
+_V2_ARGS = {
+    _CMD_NOP: 0, _CMD_INDICATE: 0,
+    _CMD_READ: 1, _CMD_READ2: 1, _CMD_READ4: 1, _CMD_READFIFO: 2,
+    _CMD_WRITE: 2, _CMD_WRITE2: 3, _CMD_WRITE4: 5, _CMD_WRITE8: 9,
+}
+_V2_FIFO_SCALE = 1 << 24
+
+
+class Resonator:
+    """SAW resonance seen through the device under test
+
+    S21 is a single pole band pass around center (Hz) with the given
+    -3dB bandwidth, peak gain and group delay. The center frequency moves
+    by drift Hz per second and complex gaussian noise of standard
+    deviation noise is added to every point. scan_time is the time the
+    device needs per measured point.
+    """
+
+    def __init__(self, center: float = 122_000_000,
+                 bandwidth: float = 300_000, gain: float = 0.3,
+                 delay: float = 1e-6, feedthrough: float = 0.01,
+                 noise: float = 1e-3, drift: float = 0.0,
+                 scan_time: float = 0.0005, seed: int = None):
+        self.center = center
+        self.bandwidth = bandwidth
+        self.gain = gain
+        self.delay = delay
+        self.feedthrough = feedthrough
+        self.noise = noise
+        self.drift = drift
+        self.scan_time = scan_time
+        self.rng = np.random.default_rng(seed)
+        self.t_start = monotonic()
+
+    def _noise(self, count: int) -> np.ndarray:
+        return self.noise * (self.rng.standard_normal(count) +
+                             1j * self.rng.standard_normal(count))
+
+    def _pole(self, freq: np.ndarray) -> np.ndarray:
+        center = self.center + self.drift * (monotonic() - self.t_start)
+        return 1 / (1 + 2j * (freq - center) / self.bandwidth)
+
+    def measure(self, freq: np.ndarray) -> np.ndarray:
+        """(points, 2) array of S11 and S21 at freq"""
+        freq = np.asarray(freq, dtype=np.float64)
+        pole = self._pole(freq)
+        s11 = 0.8 - 0.6 * pole
+        s21 = (self.gain * pole * np.exp(-2j * np.pi * freq * self.delay) +
+               self.feedthrough)
+        sleep(self.scan_time * len(freq))
+        return np.column_stack((s11 + self._noise(len(freq)),
+                                s21 + self._noise(len(freq))))
+
+
+class SimulatedDevice(Thread):
+    """device end of a pseudo terminal answering like the firmware"""
+
+    def __init__(self, resonator: Resonator = None):
+        if platform.system() == 'Windows':
+            raise IOError("Device simulation needs a pseudo terminal")
+        super().__init__(name=f"{type(self).__name__}", daemon=True)
+        self.resonator = resonator or Resonator()
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        # keep the slave end open so closing the port does not end the pty
+        self.port = os.ttyname(self.slave)
+        self.start()
+
+    def run(self):
+        buffer = b""
+        while True:
+            try:
+                buffer += os.read(self.master, 4096)
+            except OSError:
+                return
+            buffer = self.handle(buffer)
+
+    def handle(self, buffer: bytes) -> bytes:
+        """answer all complete commands in buffer, return the rest"""
+        raise NotImplementedError()
+
+    def send(self, data: bytes):
+        os.write(self.master, data)
+
+
+class SimulatedNanoVNA(SimulatedDevice):
+    """text protocol of the NanoVNA firmware with scan mask support"""
+
+    def __init__(self, resonator: Resonator = None):
+        self.frequencies = np.linspace(50_000, 900_000_000, 101)
+        self.data = np.zeros((101, 2), dtype=np.complex128)
+        super().__init__(resonator)
+
+    def handle(self, buffer: bytes) -> bytes:
+        *commands, rest = buffer.split(b"\r")
+        for command in commands:
+            command = command.strip(b"\n").decode("ascii")
+            response = self.execute(*command.split()) if command else ""
+            self.send(f"{command}\r\n{response}ch> ".encode("ascii"))
+        return rest
+
+    def execute(self, command: str, *args) -> str:
+        lines = []
+        if command == "version":
+            lines = ["1.0.0"]
+        elif command == "info":
+            lines = ["NanoVNA simulator", "NanoVNA-Saver"]
+        elif command == "help":
+            lines = ["commands: version info help scan sweep data"
+                     " frequencies bandwidth resume pause cal"]
+        elif command == "bandwidth" and not args:
+            lines = ["usage: bandwidth {10|100|1000}"]
+        elif command in ("sweep", "scan"):
+            start, stop, points = (int(x) for x in args[:3])
+            self.frequencies = np.linspace(start, stop, points).round()
+            if command == "scan":
+                self.data = self.resonator.measure(self.frequencies)
+                mask = int(args[3], 0) if len(args) > 3 else 0
+                lines = self._scan_lines(mask)
+        elif command == "data":
+            if args[0] == "0":
+                self.data = self.resonator.measure(self.frequencies)
+            lines = self._scan_lines(0b010 if args[0] == "0" else 0b100)
+        elif command == "frequencies":
+            lines = self._scan_lines(0b001)
+        elif command not in ("bandwidth", "resume", "pause", "cal"):
+            lines = [f"{command}?"]
+        return "".join(f"{line}\r\n" for line in lines)
+
+    def _scan_lines(self, mask: int) -> List[str]:
+        columns = []
+        if mask & 0b001:
+            columns.append(self.frequencies)
+        if mask & 0b010:
+            columns += [self.data[:, 0].real, self.data[:, 0].imag]
+        if mask & 0b100:
+            columns += [self.data[:, 1].real, self.data[:, 1].imag]
+        if not columns:
+            return []
+        fmt = " ".join("%d" if i == 0 and mask & 0b001 else "%.9f"
+                       for i in range(len(columns)))
+        return [fmt % row for row in zip(*columns)]
+
+
+class SimulatedNanoVNA_V2(SimulatedDevice):
+    """binary register and FIFO protocol of the NanoVNA V2"""
+
+    def __init__(self, resonator: Resonator = None):
+        self.registers = {
+            _ADDR_SWEEP_START: 200_000_000,
+            _ADDR_SWEEP_STEP: 1_000_000,
+            _ADDR_SWEEP_POINTS: 101,
+            _ADDR_DEVICE_VARIANT: 2,
+            _ADDR_PROTOCOL_VERSION: 1,
+            _ADDR_HARDWARE_REVISION: 4,
+            _ADDR_FW_MAJOR: 1,
+            _ADDR_FW_MINOR: 3,
+        }
+        self.next_point = 0
+        super().__init__(resonator)
+
+    def handle(self, buffer: bytes) -> bytes:
+        while buffer:
+            cmd = buffer[0]
+            size = 1 + _V2_ARGS.get(cmd, 0)
+            if cmd == _CMD_WRITEFIFO and len(buffer) >= 3:
+                size = 3 + buffer[2]
+            if len(buffer) < size:
+                break
+            self.execute(cmd, buffer[1:size])
+            buffer = buffer[size:]
+        return buffer
+
+    def execute(self, cmd: int, args: bytes):
+        if cmd == _CMD_INDICATE:
+            self.send(b"2")
+        elif cmd in (_CMD_READ, _CMD_READ2, _CMD_READ4):
+            size = {_CMD_READ: 1, _CMD_READ2: 2, _CMD_READ4: 4}[cmd]
+            value = self.registers.get(args[0], 0)
+            self.send(value.to_bytes(8, "little")[:size])
+        elif cmd in (_CMD_WRITE, _CMD_WRITE2, _CMD_WRITE4, _CMD_WRITE8):
+            self.registers[args[0]] = int.from_bytes(args[1:], "little")
+            if args[0] == _ADDR_VALUES_FIFO:
+                self.next_point = 0
+        elif cmd == _CMD_READFIFO:
+            self.send(self._fifo(args[1]))
+
+    def _fifo(self, count: int) -> bytes:
+        points = self.registers[_ADDR_SWEEP_POINTS]
+        index = (self.next_point + np.arange(count)) % points
+        self.next_point = (self.next_point + count) % points
+        freq = (self.registers[_ADDR_SWEEP_START] +
+                index * self.registers[_ADDR_SWEEP_STEP])
+        data = self.resonator.measure(freq) * _V2_FIFO_SCALE
+        records = np.zeros(count, dtype=_FIFO_RECORD)
+        records["fwd_real"] = _V2_FIFO_SCALE
+        records["rev0_real"], records["rev0_imag"] = \
+            data[:, 0].real, data[:, 0].imag
+        records["rev1_real"], records["rev1_imag"] = \
+            data[:, 1].real, data[:, 1].imag
+        records["freq_index"] = index
+        return records.tobytes()
+
+
+class Simulator(NanoVNA):
+    name = "Simulator"
+    valid_datapoints = (101, 11, 51, 201, 401, 1001, 4097)
+
+    def __init__(self, iface: Interface):
+        super().__init__(iface)
+        self.sweep_max_freq_Hz = 3000e6
+
+
+class Simulator_V2(NanoVNA_V2):
+    name = "Simulator-V2"
+
+
+SIMULATORS = {
+    "Simulator": SimulatedNanoVNA,
+    "Simulator-V2": SimulatedNanoVNA_V2,
+}
+_devices: Dict[str, SimulatedDevice] = {}
+
+
+def simulator_interface(comment: str,
+                        resonator: Resonator = None) -> Interface:
+    """interface to a simulated device, started on first use"""
+    if comment not in _devices or resonator is not None:
+        _devices[comment] = SIMULATORS[comment](resonator)
+    iface = Interface('serial', comment)
+    iface.port = _devices[comment].port
+    return iface
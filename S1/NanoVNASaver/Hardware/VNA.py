@@ -2,6 +2,7 @@ import logging
 from time import sleep
 from typing import List, Iterator, Set
 
+import numpy as np
 from PyQt5 import QtGui
 
 from NanoVNASaver.Version import Version
@@ -23,6 +24,7 @@ DISLORD_BW = {
     4000: 0,
 }
 WAIT = 1
+PROMPT = b"ch>"
 
 
 def _max_retries(bandwidth: int, datapoints: int) -> int:
@@ -31,6 +33,11 @@ def _max_retries(bandwidth: int, datapoints: int) -> int:
     #return 5
     #return 1000
 
+def parse_values(block: bytes, columns: int) -> np.ndarray:
+    """parse a block of whitespace separated numbers into rows"""
+    return np.array(block.split()).astype(np.float64).reshape(-1, columns)
+
+
 class VNA:
     name = "VNA"
     valid_datapoints = (101, 51, 11)
@@ -76,27 +83,36 @@ class VNA:
 
     def exec_command(self, command: str, wait: float = WAIT) -> Iterator[str]:
         logger.debug("exec_command(%s)", command)
+        for line in self.exec_command_block(command).decode(
+                "ascii").splitlines():
+            line = line.strip()
+            if line and line != command:  # suppress echo
+                yield line
+
+    def exec_command_block(self, command: str) -> bytes:
+        """read the whole response of command up to the prompt"""
+        logger.debug("exec_command_block(%s)", command)
+        echo = command.encode('ascii')
         with self.serial.lock:
             drain_serial(self.serial)
-            self.serial.write(f"{command}\r".encode('ascii'))
+            self.serial.write(echo + b"\r")
             retries = 0
-            max_retries = _max_retries(self.bandwidth, self.datapoints)
-            logger.debug("Max retries: %s", max_retries)
-            while True:
-                line = self.serial.readline()
-                line = line.decode("ascii").strip()
-                if not line:
+            # an empty read already waited one serial timeout
+            max_retries = 2 * _max_retries(self.bandwidth, self.datapoints)
+            block = bytearray()
+            while not block.endswith(PROMPT):
+                chunk = self.serial.read_until(PROMPT)
+                if not chunk:
                     retries += 1
                     if retries > max_retries:
                         raise IOError("too many retries")
-                    sleep(0.05)
                     continue
-                if line == command:  # suppress echo
-                    continue
-                if line.startswith("ch>"):
-                    logger.debug("Needed retries: %s", retries)
-                    break
-                yield line
+                block += chunk
+            logger.debug("Needed retries: %s", retries)
+        block = bytes(block[:-len(PROMPT)])
+        if block.lstrip().startswith(echo):  # suppress echo
+            block = block.lstrip()[len(echo):]
+        return block
 
     def read_features(self):
         result = " ".join(self.exec_command("help")).split()
@@ -178,6 +194,15 @@ class VNA:
                      value, len(result))
         return result
 
+    def readValuesArray(self, value) -> np.ndarray:
+        """Read "data 0" / "data 1" as a complex array"""
+        result = self.readValues(value)
+        if not result:
+            return np.empty(0, dtype=np.complex128)
+        values = np.array([line.split() for line in result],
+                          dtype=np.float64)
+        return values[:, 0] + 1j * values[:, 1]
+
     def readVersion(self) -> 'Version':
         result = list(self.exec_command("version"))
         logger.debug("result:\n%s", result)
@@ -317,8 +317,10 @@ class Marker(QtCore.QObject, Value):
         if len(s21) == len(s11):
             _s21 = s21[self.location]
             self.label["s21gain"].setText(format_gain(_s21.gain))
+            delay = RFTools.group_delays(s21)
             self.label["s21groupdelay"].setText(
-                format_group_delay(RFTools.groupDelay(s21, self.location) / 2) )
+                format_group_delay(
+                    (delay[self.location] if len(delay) else 0) / 2))
             self.label["s21phase"].setText(format_phase(_s21.phase))
 
 
@@ -12,7 +12,7 @@ from PyQt5 import QtWidgets, QtCore, QtGui
 
 import matplotlib.pyplot as plt
 import pyqtgraph as pg
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from NanoVNASaver import Defaults
 
@@ -28,7 +28,9 @@ from .Controls.SerialControl import SerialControl
 from .Hardware.Hardware import Interface
 from .Hardware.VNA import VNA
 
-from .RFTools import corr_att_data
+from .AnalyticTools import fit_resonance, resonance_at, track_resonance
+from .RFTools import corr_att_data, from_datapoints
+from .RollingStats import Summary
 
 from .Charts.Chart import Chart
 
@@ -38,6 +40,7 @@ from .Calibration import Calibration
 from .Marker.Widget import Marker
 from .Marker.Delta import DeltaMarker
 from .SweepWorker import SweepWorker
+from .TimeSeries import TimeSeries
 from .Settings.Bands import BandsModel
 from .Touchstone import Touchstone
 from .About import VERSION
@@ -50,6 +53,8 @@ logger = logging.getLogger(__name__)
 class NanoVNASaver(QtWidgets.QWidget):
     version = VERSION
     dataAvailable = QtCore.pyqtSignal()
+    # minimum time between redraws of the kinetics plot in ms
+    kinetics_interval = 200
     scaleFactor = 1
 
     def __init__(self):
@@ -76,7 +81,7 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.worker.signals.updated.connect(self.dataUpdated)
         self.worker.signals.finished.connect(self.sweepFinished)
         self.worker.signals.sweepError.connect(self.showSweepError)
-        self.worker.signals.calcnow.connect(lambda : self.calcnow())
+        self.worker.signals.calcnow.connect(self.calcnow)
 
         self.markers = []
         self.marker_ref = False
@@ -311,6 +316,16 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.difhz=0
         self.frgain_label_dif = QtWidgets.QLabel()
         s21_control_layout.addRow("Dif[KHz]:", self.frgain_label_dif)
+
+        # rolling statistics of the resonance frequency
+        self.frrate_label = QtWidgets.QLabel()
+        s21_control_layout.addRow("Tasa[Hz/s]:", self.frrate_label)
+
+        self.frmedian_label = QtWidgets.QLabel()
+        s21_control_layout.addRow("Mediana[MHz]:", self.frmedian_label)
+
+        self.frnoise_label = QtWidgets.QLabel()
+        s21_control_layout.addRow("Ruido[Hz]:", self.frnoise_label)
         ###########################################################
 
         self.marker_column.addWidget(s21_control_box)
@@ -332,17 +347,22 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.difhz = 0
         self.difph = 0
 
-        self.tx: List[float] = []
-        self.yv: List[float] = []
-        #self.tx.append(0)
-        #self.yv.append(0)
+        # phase over time, drawn by one curve updated at most every
+        # kinetics_interval ms
+        self.kinetics = TimeSeries()
+        self.kinetics_timer = QtCore.QTimer(self)
+        self.kinetics_timer.setSingleShot(True)
+        self.kinetics_timer.setInterval(self.kinetics_interval)
+        self.kinetics_timer.timeout.connect(self.updateKinetics)
 
         self.graphWidget.setLabel('left', 'Phase', units='Degrees')
         self.graphWidget.setLabel('bottom', 'Time', units='s')
         self.graphWidget.setYRange(-30, 15)
 
         # plot data: x, y values
-        self.plot = self.graphWidget.plot(self.tx, self.yv)
+        self.plot = self.graphWidget.plot()
+        self.plot.setClipToView(True)
+        self.plot.setDownsampling(auto=True, method="peak")
         self.graphWidget.resize(50, 50)
         self.tly.addWidget(self.graphWidget)
         self.boxtly = QtWidgets.QGroupBox()
@@ -470,7 +490,7 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.worker.mg.clear()
         self.worker.dg.clear()
 
-        self.worker.alls21.clear()
+        self.worker.history.clear()
         self.worker.tm.clear()
 
         self.tst_sweep.setText("ON")
@@ -478,7 +498,7 @@ class NanoVNASaver(QtWidgets.QWidget):
         if self.sweep.properties.mode == SweepMode.SINGLE:
             self.mode_sweep.setText("Simple (1)")
 
-        if self.sweep.properties.mode == SweepMode.CONTINOUS:
+        if self.sweep.properties.mode.continuous:
             self.mode_sweep.setText("Continuo ()")
 
         self.sweep_control.progress_bar.setValue(0)
@@ -488,8 +508,7 @@ class NanoVNASaver(QtWidgets.QWidget):
 
         self.settings.setValue("Segments", self.sweep_control.get_segments())
 
-        if self.sweep.properties.mode == SweepMode.CONTINOUS:
-            self.graphWidget.clear()
+        if self.sweep.properties.mode.continuous:
             self.ttot=0
 
         logger.debug("Starting worker thread")
@@ -708,18 +727,19 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.frgain_label_dif.setText(" ")
         self.phgain_label.setText(" ")
         self.phgain_label_dif.setText(" ")
+        self.frrate_label.setText(" ")
+        self.frmedian_label.setText(" ")
+        self.frnoise_label.setText(" ")
         self.t_sweep.setText(" ")
         self.ttot_sweep.setText(" ")
 
-        self.tx.clear()
-        #self.tx.append(0)
-        self.yv.clear()
-        #self.yv.append(0)
+        self.kinetics.clear()
         self.ttot=0
 
-        self.graphWidget.clear()
+        self.kinetics_timer.stop()
+        self.updateKinetics()
 
-    def calcnow(self):
+    def calcnow(self, stats: Dict[str, Summary]):
 
             with self.dataLock:
                 s21 = self.data.s21[:]
@@ -731,6 +751,9 @@ class NanoVNASaver(QtWidgets.QWidget):
                 self.gain_label.setText(f"{self.worker.actm:.3f}")
                 self.phgain_label.setText(f"{self.worker.actg:.3f}")
                 self.frgain_label.setText(f"{(self.worker.actf / 1000000):.6f}")
+                self.frgain_label.setToolTip(
+                    f"\u00b1 {self.worker.actfe:.1f} Hz"
+                    if math.isfinite(self.worker.actfe) else "")
 
                 ddb=self.worker.actm-self.difdb
                 dhz=self.worker.actf-self.difhz
@@ -743,25 +766,34 @@ class NanoVNASaver(QtWidgets.QWidget):
                 self.difhz=self.worker.actf
                 self.difph=self.worker.actg
 
-                self.ttot = round (self.ttot + self.worker.actt , 2)
-                self.tx.append(self.ttot)
-
-                self.yv.append(self.worker.actg)
+                fr_stats = stats["fr"]
+                if fr_stats.count:
+                    self.frrate_label.setText(f"{fr_stats.slope:.3f}")
+                    self.frmedian_label.setText(
+                        f"{fr_stats.median / 1000000:.6f}")
+                    self.frnoise_label.setText(f"{fr_stats.noise:.1f}")
 
-                self.graphWidget.plot(self.tx, self.yv)
+                self.ttot = round (self.ttot + self.worker.actt , 2)
+                self.kinetics.append(self.ttot, self.worker.actg)
+                if not self.kinetics_timer.isActive():
+                    self.kinetics_timer.start()
 
 
                 self.t_sweep.setText((f"{self.worker.actt}"))
                 self.ttot_sweep.setText((f"{self.ttot}"))
 
 
-                if self.sweep.properties.mode == SweepMode.CONTINOUS:
+                if self.sweep.properties.mode.continuous:
                     numb=str(self.worker.inic)
                     modeswp=("Continuo (") + numb + (")")
                     self.mode_sweep.setText(modeswp)
 
                 self.updateTitle()
                 self.dataAvailable.emit()
+
+    def updateKinetics(self):
+        self.plot.setData(self.kinetics.time, self.kinetics.value)
+
     ########################################################################333
 
     def calc(self):
@@ -779,26 +811,21 @@ class NanoVNASaver(QtWidgets.QWidget):
                 actf = 0
                 actg = 0
 
-                if self.sweep.properties.anmode == 0:
-
-                    mg = -100
-                    cont = 0
+                freq, values = from_datapoints(s21)
 
-                    for i in s21:
-                        if i.gain > mg:
-                            if  -2 < i.phase * (180 / 3.14) < 2:
-                                actm = i.gain
-                                actf = i.freq
-                                actg = i.phase * (180 / 3.14)
-                                self.actfr = cont
-                                mg = i.gain
-                        cont = cont + 1
+                if self.sweep.properties.anmode == 0:
+                    resonance = track_resonance(freq, values, window=2)
+                    if resonance:
+                        self.actfr, actf, actm, actg = resonance
+                        if self.worker.peak_fit:
+                            actf, actm, actg, _ = fit_resonance(
+                                freq, values, resonance.index,
+                                self.worker.peak_fit_points,
+                                self.worker.peak_fit)
 
                 if self.sweep.properties.anmode == 1:
-
-                        actm = s21[self.actfr].gain
-                        actf = s21[self.actfr].freq
-                        actg = s21[self.actfr].phase * (180 / 3.14)
+                    _, actf, actm, actg = resonance_at(
+                        freq, values, self.actfr)
 
 
                 self.gain_label.setText(f"{actm:.3f}")
@@ -889,7 +916,7 @@ class NanoVNASaver(QtWidgets.QWidget):
                     df.to_excel(writer, 'Hoja de datos', index=False)
                     writer.save()
 
-            if banderita == 1 and self.sweep.properties.mode == SweepMode.CONTINOUS :
+            if banderita == 1 and self.sweep.properties.mode.continuous :
 
                 rows = len(self.worker.mg)
 
@@ -18,7 +18,10 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import math
 import cmath
-from typing import List, NamedTuple
+from functools import partial
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
 
 from NanoVNASaver.SITools import Format, clamp_value
 
@@ -106,9 +109,51 @@ def gamma_to_impedance(gamma: complex, ref_impedance: float = 50) -> complex:
 def groupDelay(data: List[Datapoint], index: int) -> float:
     idx0 = clamp_value(index - 1, 0, len(data) - 1)
     idx1 = clamp_value(index + 1, 0, len(data) - 1)
-    delta_angle = data[idx1].phase - data[idx0].phase
-    delta_freq = data[idx1].freq - data[idx0].freq
-    return 0 if delta_freq == 0 else -delta_angle / math.tau / delta_freq
+    if idx0 == idx1:
+        return 0
+    return float(group_delay(
+        *from_datapoints(data[idx0:idx1 + 1]))[index - idx0])
+
+
+def group_delay(freq: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Group delay in seconds at every frequency from the central
+    difference of the unwrapped phase, one sided at the ends, 0 where
+    the frequency does not change, none for a single point"""
+    size = len(freq)
+    if size < 2:
+        return np.zeros(0)
+    index = np.arange(size)
+    idx0 = np.maximum(index - 1, 0)
+    idx1 = np.minimum(index + 1, size - 1)
+    phase = np.unwrap(np.angle(values))
+    freq = np.asarray(freq, dtype=np.float64)
+    delta_angle = phase[idx1] - phase[idx0]
+    delta_freq = freq[idx1] - freq[idx0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(delta_freq == 0, 0.0,
+                        -delta_angle / math.tau / delta_freq)
+
+
+# points and group delays of the last group_delays() calls
+_group_delays: List[Tuple[Tuple[Datapoint, ...], np.ndarray]] = []
+
+
+def group_delays(data: List[Datapoint]) -> np.ndarray:
+    """Read-only group delay of a Datapoint list, computed once per list
+    and shared by the charts and markers showing it
+
+    The cache holds the points themselves, not the list, so a list
+    changed in place is recomputed. Datapoints are immutable and the
+    comparison checks identity first, so a hit only walks the pointers.
+    """
+    points = tuple(data)
+    for cached, delay in _group_delays:
+        if cached == points:
+            return delay
+    delay = group_delay(*from_datapoints(data))
+    delay.flags.writeable = False
+    _group_delays[:] = _group_delays[-3:] + [(points, delay)]
+    return delay
 
 
 def impedance_to_capacitance(z: complex, freq: float) -> float:
@@ -167,3 +212,23 @@ def corr_att_data(data: List[Datapoint], att: float) -> List[Datapoint]:
         corrected = dp.z * att
         ndata.append(Datapoint(dp.freq, corrected.real, corrected.imag))
     return ndata
+
+
+def to_datapoints(freq: Sequence[int],
+                  values: Sequence[complex]) -> List[Datapoint]:
+    """Build a Datapoint list from a frequency and a complex value array"""
+    values = np.asarray(values, dtype=np.complex128)
+    # tuple.__new__ skips the per item Python level constructor
+    return list(map(partial(tuple.__new__, Datapoint),
+                    zip(np.asarray(freq).tolist(),
+                        values.real.tolist(), values.imag.tolist())))
+
+
+def from_datapoints(data: List[Datapoint]) -> Tuple[np.ndarray, np.ndarray]:
+    """Split a Datapoint list into a frequency and a complex value array"""
+    if not data:
+        return (np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.complex128))
+    arr = np.array(data, dtype=np.float64)
+    return (arr[:, 0].astype(np.int64),
+            arr[:, 1] + 1j * arr[:, 2])
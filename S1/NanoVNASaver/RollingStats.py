@@ -0,0 +1,200 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Incremental statistics of a time series
+
+RollingStats keeps the mean and variance of all samples (Welford) and
+the linear trend, median and noise of the last window samples, updated
+per sample without walking the history. The window sums are taken
+relative to a reference sample and rebuilt once per window, so rounding
+errors neither cancel the small changes of a large value like a
+resonance frequency nor build up over long runs.
+
+The median splits the window into a max heap of the lower and a min
+heap of the upper half. Samples leaving the window are only marked and
+dropped once they reach the top of their heap, the heaps are rebuilt
+with the sums, so a sample costs O(log window).
+"""
+import heapq
+import math
+from collections import Counter, deque
+from typing import Deque, List, NamedTuple, Tuple
+
+
+class Summary(NamedTuple):
+    count: int
+    last: float
+    mean: float
+    std: float
+    median: float
+    slope: float
+    noise: float
+
+
+class RollingStats:
+    def __init__(self, window: int = 30):
+        if window < 1:
+            raise ValueError(f"Illegal window {window}")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.last = math.nan
+        self._mean = 0.0
+        self._m2 = 0.0
+        # window samples, median heaps and sums of (t - t0), (y - y0)
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._low: List[float] = []  # negated values
+        self._high: List[float] = []
+        self._leaving: Counter = Counter()
+        self._balance = 0  # window samples in _low - in _high
+        self._ref = (0.0, 0.0)
+        self._sums = [0.0] * 5  # t, y, tt, ty, yy
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, time: float, value: float):
+        """add a sample, values that are not finite are ignored"""
+        if not math.isfinite(value):
+            return
+        if not self.count:
+            self._ref = (time, value)
+        self.count += 1
+        self.last = value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+        self._samples.append((time, value))
+        self._insert(value)
+        self._update_sums(time, value, 1)
+        if len(self._samples) > self.window:
+            old_time, old_value = self._samples.popleft()
+            self._remove(old_value)
+            self._update_sums(old_time, old_value, -1)
+            self._removed += 1
+            if self._removed % self.window == 0:
+                self._rebuild_sums()
+                self._rebuild_heaps()
+
+    def _insert(self, value: float):
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._balance += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._balance -= 1
+        self._rebalance()
+
+    def _remove(self, value: float):
+        # every value in _high is >= the top of _low
+        self._leaving[value] += 1
+        if value <= -self._low[0]:
+            self._balance -= 1
+            self._prune(self._low, -1)
+        else:
+            self._balance += 1
+            self._prune(self._high, 1)
+        self._rebalance()
+
+    def _rebalance(self):
+        if self._balance > 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._balance -= 2
+            self._prune(self._low, -1)
+        elif self._balance < 0:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._balance += 2
+            self._prune(self._high, 1)
+
+    def _prune(self, heap: List[float], sign: int):
+        while heap and self._leaving[sign * heap[0]]:
+            self._leaving[sign * heapq.heappop(heap)] -= 1
+
+    def _rebuild_heaps(self):
+        values = sorted(value for _, value in self._samples)
+        half = (len(values) + 1) // 2
+        self._low = [-value for value in values[:half]]
+        heapq.heapify(self._low)
+        self._high = values[half:]
+        self._leaving.clear()
+        self._balance = half - len(self._high)
+
+    def _update_sums(self, time: float, value: float, sign: int):
+        t, y = time - self._ref[0], value - self._ref[1]
+        for i, term in enumerate((t, y, t * t, t * y, y * y)):
+            self._sums[i] += sign * term
+
+    def _rebuild_sums(self):
+        self._ref = self._samples[0]
+        self._sums = [0.0] * 5
+        for time, value in self._samples:
+            self._update_sums(time, value, 1)
+
+    def summary(self) -> Summary:
+        """the statistics at this sample, safe to hand to another thread"""
+        return Summary(self.count, self.last, self.mean, self.std,
+                       self.median, self.slope, self.noise)
+
+    @property
+    def mean(self) -> float:
+        """mean of all samples"""
+        return self._mean if self.count else math.nan
+
+    @property
+    def variance(self) -> float:
+        """sample variance of all samples"""
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def median(self) -> float:
+        """median of the window"""
+        if not self._samples:
+            return math.nan
+        if self._balance:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    def _centered(self) -> Tuple[int, float, float, float]:
+        n = len(self._samples)
+        s_t, s_y, s_tt, s_ty, s_yy = self._sums
+        return (n, s_tt - s_t * s_t / n, s_ty - s_t * s_y / n,
+                s_yy - s_y * s_y / n)
+
+    @property
+    def slope(self) -> float:
+        """least squares rate of change over the window, per time unit"""
+        if len(self._samples) < 2:
+            return math.nan
+        _, stt, sty, _ = self._centered()
+        return sty / stt if stt > 0 else math.nan
+
+    @property
+    def noise(self) -> float:
+        """standard deviation of the window around its linear trend"""
+        if len(self._samples) < 3:
+            return math.nan
+        n, stt, sty, syy = self._centered()
+        residual = syy - (sty * sty / stt if stt > 0 else 0.0)
+        return math.sqrt(max(residual, 0.0) / (n - 2))
@@ -1,6 +1,6 @@
 import logging
 from enum import Enum
-from math import log
+from math import ceil, log
 from threading import Lock
 from typing import Iterator, Tuple
 
@@ -11,6 +11,13 @@ class SweepMode(Enum):
     SINGLE = 0
     CONTINOUS = 1
     AVERAGE = 2
+    # continuous sweeps narrowed around the tracked resonance, faster
+    # than CONTINOUS only for sweeps of more than one segment
+    ZOOM = 3
+
+    @property
+    def continuous(self) -> bool:
+        return self in (SweepMode.CONTINOUS, SweepMode.ZOOM)
 
 
 class Properties:
@@ -70,6 +77,21 @@ class Sweep:
     def stepsize(self) -> int:
         return round(self.span / (self.points * self.segments - 1))
 
+    def zoom(self, center: int, span: int) -> 'Sweep':
+        """sweep of span around center within this sweep
+
+        The device reads a fixed number of points per segment, so the
+        zoomed sweep keeps at least the point density of this one with
+        fewer segments. It is only faster if this sweep has more than
+        one segment, a single segment zoom trades span for resolution.
+        """
+        span = min(max(round(span), 2 * self.points), self.span)
+        segments = min(self.segments, ceil(self.segments * span / self.span))
+        start = min(max(round(center) - span // 2, self.start),
+                    self.end - span)
+        return Sweep(start, start + span, self.points, segments,
+                     self.properties)
+
     def check(self):
         if (
                 self.segments <= 0
@@ -0,0 +1,293 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Append-only store for the sweeps of a continuous run
+
+The file starts with MAGIC, the number of points (uint64) and the
+frequency axis (int64), followed by one fixed size record per sweep
+holding its time, the resonance values fr, mg and dg and the complex
+S11 and S21 arrays. All values are little endian. An incomplete record
+at the end, e.g. after a crash, is ignored.
+
+load_snapshots() builds such a store from a directory of s2p files.
+SweepHistory keeps the last sweeps of a run in memory.
+"""
+import json
+import logging
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from typing import BinaryIO, Callable, List, Tuple
+
+import numpy as np
+
+from NanoVNASaver.RFTools import Datapoint, from_datapoints, to_datapoints
+from NanoVNASaver.Touchstone import Touchstone
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NVSWEEP1"
+# cache of load_snapshots() inside the run directory
+SNAPSHOT_CACHE = ".snapshots.sweeps"
+_HEADER = np.dtype([("magic", "S8"), ("points", "<u8")])
+
+
+def record_dtype(points: int) -> np.dtype:
+    return np.dtype([
+        ("time", "<f8"), ("fr", "<f8"), ("mg", "<f8"), ("dg", "<f8"),
+        ("s11", "<c16", (points,)), ("s21", "<c16", (points,)),
+    ])
+
+
+class SweepStore:
+    def __init__(self, filename: str):
+        self.filename = filename
+        header = np.fromfile(filename, dtype=_HEADER, count=1)
+        if len(header) != 1 or header["magic"][0] != MAGIC:
+            raise IOError(f"{filename} is not a sweep store")
+        points = int(header["points"][0])
+        self.frequencies = np.fromfile(
+            filename, dtype="<i8", count=points, offset=_HEADER.itemsize)
+        if len(self.frequencies) != points:
+            raise IOError(f"{filename} has a truncated header")
+        self.dtype = record_dtype(points)
+        self.offset = _HEADER.itemsize + self.frequencies.nbytes
+        self._file: BinaryIO = None
+        self._records = np.zeros(0, dtype=self.dtype)
+
+    @classmethod
+    def create(cls, filename: str, frequencies: np.ndarray) -> 'SweepStore':
+        """start a new store over frequencies, replacing filename"""
+        header = np.array([(MAGIC, len(frequencies))], dtype=_HEADER)
+        with open(filename, "wb") as outfile:
+            outfile.write(header.tobytes())
+            outfile.write(np.asarray(frequencies, dtype="<i8").tobytes())
+        return cls(filename)
+
+    def __len__(self) -> int:
+        return ((os.path.getsize(self.filename) - self.offset) //
+                self.dtype.itemsize)
+
+    @property
+    def records(self) -> np.ndarray:
+        """memory mapped view of all complete records"""
+        count = len(self)
+        if count != len(self._records):
+            self._records = (
+                np.memmap(self.filename, dtype=self.dtype, mode="r",
+                          offset=self.offset, shape=(count,))
+                if count else np.zeros(0, dtype=self.dtype))
+        return self._records
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def append(self, time: float, s11: np.ndarray, s21: np.ndarray,
+               fr: float = np.nan, mg: float = np.nan, dg: float = np.nan):
+        record = np.zeros(1, dtype=self.dtype)
+        record[0] = (time, fr, mg, dg, s11, s21)
+        if self._file is None:
+            self._file = open(self.filename, "ab")
+            # drop an incomplete record left by an interrupted run
+            self._file.truncate(self.offset + len(self) *
+                                self.dtype.itemsize)
+        self._file.write(record.tobytes())
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def history_dtype(points: int) -> np.dtype:
+    return np.dtype([
+        ("time", "<f8"), ("length", "<i8"), ("freq", "<i8", (points,)),
+        ("s11", "<c16", (points,)), ("s21", "<c16", (points,)),
+    ])
+
+
+class SweepHistory:
+    """ring buffer of the last depth sweeps of up to points points
+
+    Every sweep is written twice, capacity records apart, so the last n
+    sweeps are always a contiguous view of the buffer, oldest first.
+    The capacity doubles up to depth as sweeps arrive, views taken before
+    keep the old buffer.
+    Points beyond the length of a shorter sweep are nan. A sweep pushed
+    out of a full buffer is passed to spill(time, s11, s21) if given,
+    e.g. SweepStore.append of a store over the same frequencies.
+    The arrays passed are only valid during the call.
+    """
+
+    def __init__(self, depth: int, points: int,
+                 spill: Callable[[float, np.ndarray, np.ndarray],
+                                 None] = None):
+        if depth < 1:
+            raise ValueError(f"Illegal history depth {depth}")
+        self.depth = depth
+        self.points = points
+        self.spill = spill
+        self._buffer = np.zeros(2, dtype=history_dtype(points))
+        self.clear()
+
+    @property
+    def _capacity(self) -> int:
+        return len(self._buffer) // 2
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, time: float, freq: np.ndarray,
+               s11: np.ndarray, s21: np.ndarray):
+        length = len(freq)
+        if length > self.points:
+            raise ValueError(
+                f"Sweep of {length} points exceeds history of {self.points}")
+        if self._count == self.depth:
+            if self.spill is not None:
+                old = self._buffer[self._next]
+                size = old["length"]
+                self.spill(old["time"], old["s11"][:size],
+                           old["s21"][:size])
+            self.dropped += 1
+        else:
+            if self._count == self._capacity:
+                self._grow()
+            self._count += 1
+        for index in (self._next, self._next + self._capacity):
+            record = self._buffer[index]
+            record["time"], record["length"] = time, length
+            record["freq"][:length], record["freq"][length:] = freq, 0
+            record["s11"][:length], record["s11"][length:] = s11, np.nan
+            record["s21"][:length], record["s21"][length:] = s21, np.nan
+        self._next = (self._next + 1) % self._capacity
+
+    def _grow(self):
+        old = self.last()
+        capacity = min(2 * self._capacity, self.depth)
+        self._buffer = np.zeros(2 * capacity, dtype=self._buffer.dtype)
+        self._buffer[:len(old)] = old
+        self._buffer[capacity:capacity + len(old)] = old
+        self._next = len(old)
+
+    def last(self, count: int = None) -> np.ndarray:
+        """view of the last count sweeps, oldest first"""
+        count = self._count if count is None else min(count, self._count)
+        end = self._next + self._capacity
+        return self._buffer[end - count:end]
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray,
+                                               np.ndarray]:
+        """frequencies, S11 and S21 of sweep index, oldest first"""
+        if not -self._count <= index < self._count:
+            raise IndexError(f"history index {index} out of range")
+        record = self.last()[index]
+        size = record["length"]
+        return record["freq"][:size], record["s11"][:size], \
+            record["s21"][:size]
+
+    def datapoints(self, index: int) -> Tuple[List[Datapoint],
+                                              List[Datapoint]]:
+        freq, s11, s21 = self[index]
+        return to_datapoints(freq, s11), to_datapoints(freq, s21)
+
+
+def _snapshot_key(name: str) -> Tuple[float, str]:
+    # <n>xBarrido.s2p sorts by sweep number n
+    number = re.match(r"\d+", name)
+    return (int(number.group()) if number else math.inf), name
+
+
+def _parse_snapshot(filename: str) -> Tuple[np.ndarray, np.ndarray,
+                                            np.ndarray]:
+    ts = Touchstone(filename)
+    ts.load()
+    freq, s11 = from_datapoints(ts.s11)
+    return freq, s11, from_datapoints(ts.s21)[1]
+
+
+def _parse_snapshots(filenames: List[str], processes: int = None) -> list:
+    if processes == 1 or len(filenames) < 2:
+        return list(map(_parse_snapshot, filenames))
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(_parse_snapshot, filenames, chunksize=16))
+
+
+def load_snapshots(directory: str, pattern: str = "*.s2p",
+                   processes: int = None) -> SweepStore:
+    """stack the s2p snapshots of a run directory into a cached store
+
+    Files are parsed by a pool of processes into SNAPSHOT_CACHE in the
+    directory, so store.records["s21"] is a memory mapped (sweeps,
+    points) array. The cache is reused as long as the files it was
+    built from are unchanged, new snapshots are appended to it.
+
+    s2p files hold no sweep time, so the time of a record is its sweep
+    number <n> from the file name <n>xBarrido.s2p, or its position in
+    the run for other names. File times are not used, copying a run
+    rewrites them.
+    """
+    entries = sorted((entry for entry in os.scandir(directory)
+                      if entry.is_file() and fnmatch(entry.name, pattern)),
+                     key=lambda entry: _snapshot_key(entry.name))
+    if not entries:
+        raise FileNotFoundError(f"No {pattern} snapshots in {directory}")
+    manifest = [[entry.name, entry.stat().st_size,
+                 entry.stat().st_mtime_ns] for entry in entries]
+
+    cache = os.path.join(directory, SNAPSHOT_CACHE)
+    try:
+        with open(f"{cache}.json", encoding="utf-8") as infile:
+            cached = json.load(infile)
+        store = SweepStore(cache)
+        if manifest[:len(cached)] != cached or len(store) != len(cached):
+            raise ValueError("snapshots changed")
+    except (OSError, ValueError) as exc:
+        logger.debug("Rebuilding %s: %s", cache, exc)
+        cached, store = [], None
+
+    new = entries[len(cached):]
+    if not new:
+        return store
+    logger.info("Parsing %d snapshots in %s", len(new), directory)
+    parsed = _parse_snapshots([entry.path for entry in new], processes)
+    if store is None:
+        store = SweepStore.create(cache, parsed[0][0])
+    try:
+        for index, (entry, (freq, s11, s21)) in enumerate(
+                zip(new, parsed), len(cached)):
+            if not np.array_equal(freq, store.frequencies):
+                raise ValueError(
+                    f"{entry.path} does not match the frequencies of the"
+                    f" other snapshots")
+            number = _snapshot_key(entry.name)[0]
+            store.append(number if math.isfinite(number) else index,
+                         s11, s21)
+    finally:
+        store.close()
+    with open(f"{cache}.json", "w", encoding="utf-8") as outfile:
+        json.dump(manifest, outfile)
+    return store
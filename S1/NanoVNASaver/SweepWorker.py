@@ -1,7 +1,10 @@
 import logging
+import os
+import queue
+import threading
 from time import sleep
 import time
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 import math
 
 import numpy as np
@@ -12,37 +15,61 @@ from scipy import ndimage
 from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtCore import pyqtSlot, pyqtSignal
 
-from NanoVNASaver.Calibration import correct_delay
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.AnalyticTools import (
+    fit_resonance, resonance_at, track_resonance)
+from NanoVNASaver.Calibration import correct_delay_array
+from NanoVNASaver.RFTools import Datapoint, to_datapoints, from_datapoints
+from NanoVNASaver.RollingStats import RollingStats
 from NanoVNASaver.Settings.Sweep import Sweep, SweepMode
-from NanoVNASaver.Touchstone import Touchstone
+from NanoVNASaver.SweepStore import SweepHistory, SweepStore, history_dtype
+from NanoVNASaver.Touchstone import TouchstoneWriter
 
 logger = logging.getLogger(__name__)
 
-def truncate(values: List[List[Tuple]], count: int) -> List[List[Tuple]]:
+def truncate(values: List[np.ndarray], count: int) -> np.ndarray:
     """truncate drops extrema from data list if averaging is active"""
     keep = len(values) - count
     logger.debug("Truncating from %d values to %d", len(values), keep)
     if count < 1 or keep < 1:
         logger.info("Not doing illegal truncate")
         return values
-    truncated = []
-    for valueset in np.swapaxes(values, 0, 1).tolist():
-        avg = complex(*np.average(valueset, 0))
-        truncated.append(
-            sorted(valueset,
-                   key=lambda v, a=avg:
-                   abs(a - complex(*v)))[:keep])
-    return np.swapaxes(truncated, 0, 1).tolist()
+    values = np.asarray(values)
+    avg = np.average(values, 0)
+    closest = np.argsort(np.abs(values - avg), axis=0, kind="stable")
+    return np.take_along_axis(values, closest[:keep], 0)
+
 
 class WorkerSignals(QtCore.QObject):
     updated = pyqtSignal()
     finished = pyqtSignal()
     sweepError = pyqtSignal()
-    calcnow = pyqtSignal()
+    # summaries of the rolling statistics, by name
+    calcnow = pyqtSignal(dict)
 
 
 class SweepWorker(QtCore.QRunnable):
+    # completed segments buffered between reader and processing stage
+    pipeline_depth = 4
+    # continuous mode runs are stored in the "SweepDirectory" of the
+    # settings as run_name_<start time>.sweeps, "SweepSnapshots" also
+    # writes one <sweep>x<run_name>.s2p file per sweep
+    run_name = "Barrido"
+    # interpolate the tracked resonance between sweep points,
+    # "lorentzian", "parabolic" or None for the grid point
+    peak_fit = "lorentzian"
+    peak_fit_points = 5
+    # zoom mode: the narrow span is the full span / zoom_ratio, it is
+    # re-centred once the resonance leaves its central half and widened
+    # to the full span when it comes within zoom_margin of an edge
+    zoom_ratio = 10
+    zoom_margin = 0.1
+    # sweeps in the window of the rolling statistics
+    stats_window = 30
+    # sweeps kept in memory during a continuous run, at most
+    # history_memory bytes
+    history_depth = 1000
+    history_memory = 256 << 20
+
     def __init__(self, app: QtWidgets.QWidget):
         super().__init__()
         logger.info("Initializing SweepWorker")
@@ -51,16 +78,25 @@ class SweepWorker(QtCore.QRunnable):
         self.sweep = Sweep()
         self.setAutoDelete(False)
         self.percentage = 0
-        self.data11: List[Datapoint] = []
-        self.data21: List[Datapoint] = []
-        self.rawData11: List[Datapoint] = []
-        self.rawData21: List[Datapoint] = []
+        # columnar sweep buffers, one shared frequency axis
+        self.frequencies = np.empty(0, dtype=np.int64)
+        self.s11 = np.empty(0, dtype=np.complex128)
+        self.s21 = np.empty(0, dtype=np.complex128)
+        self.raw_s11 = np.empty(0, dtype=np.complex128)
+        self.raw_s21 = np.empty(0, dtype=np.complex128)
+        # Datapoint lists of the buffers handed out, see _datapoints()
+        self._lists: Dict[str, List[Datapoint]] = {}
         self.init_data()
         self.stopped = False
         self.running = False
         self.error_message = ""
         self.offsetDelay = 0
         self.time_sweep = 0.0
+        # continuous mode snapshots are written off the sweep thread
+        self.writer = TouchstoneWriter()
+        self.s2p_snapshots = False
+        # continuous mode sweeps of the current run
+        self.store: SweepStore = None
 
         #Parametros de escritura Continua
 
@@ -68,18 +104,29 @@ class SweepWorker(QtCore.QRunnable):
         self.fr: List[float] = []
         self.mg: List[float] = []
         self.dg: List[float] = []
+        # live statistics of the resonance series over the sweep time,
+        # only used by the sweep thread, see calcnow for the others
+        self.stats = {
+            "fr": RollingStats(self.stats_window),
+            "mg": RollingStats(self.stats_window),
+            "dg": RollingStats(self.stats_window),
+        }
 
         #Vector de datapoints S21 - Tiempos de barrido - Contador de Sweeps
-        self.alls21:List[List[Datapoint]] = []
-        self.alls11: List[List[Datapoint]] = []
+        # last history_depth sweeps, every sweep is in the store
+        self.history = SweepHistory(self.history_depth, 0)
         self.tm: List[float] = []
         self.inic = 0
         #Valores Actuales de F-dB-Ph-t
 
         self.actfr = 0
         self.actf = 0
+        # actfr and actf were found in the last sweep
+        self.tracked = False
         self.actg = 0
         self.actm = 0
+        # standard deviation of actf, nan without peak fit
+        self.actfe = math.nan
 
         self.actt = 0
         self.actdp = 0
@@ -113,6 +160,7 @@ class SweepWorker(QtCore.QRunnable):
         if sweep != self.sweep:  # parameters changed
             self.sweep = sweep
             self.init_data()
+            self.app.calibration.invalidate_terms()
 
         self._run_loop()
 
@@ -139,53 +187,48 @@ class SweepWorker(QtCore.QRunnable):
         self.nstop = sweep.properties.nsweeps
         self.inic = 0
         self.ttr=0
-        self.alls11.clear()
-        self.alls21.clear()
+        points = len(self.frequencies)
+        # single and averaged sweeps keep only the last one
+        self.history = SweepHistory(
+            max(1, min(self.history_depth, self.history_memory //
+                       (2 * history_dtype(points).itemsize)))
+            if sweep.properties.mode.continuous else 1, points)
         self.tm.clear()
+        for stats in self.stats.values():
+            stats.reset()
+
+        filename = (self._run_filename() if sweep.properties.mode.continuous
+                    else "")
+        self.s2p_snapshots = self.app.settings.value(
+            "SweepSnapshots", False, bool)
+
+        # The reader thread owns the serial port and keeps the device
+        # sweeping while this thread filters, calibrates and analyses
+        # the segments it has already delivered.
+        segments = queue.Queue(maxsize=self.pipeline_depth)
+        # zoom mode: next sweep, known only after analysing the last one
+        sweeps = queue.Queue()
+        done = threading.Event()
+        reader = threading.Thread(
+            target=self._read_loop,
+            args=(sweep, averages, segments, sweeps, done),
+            name="SweepReader", daemon=True)
+        t_st = time.time()
+        reader.start()
 
-        filename='D:/Usuario Martin/Escritorio/Experimentos/Exps/Barrido.s2p'
-
-        #print(self.app.vna.datapoints)
-
-        cantseg = 0
-        multcantseg = 1
-
-        if sweep.segments <=4 :
-            cantseg = 1
-        else :
-            cantseg = sweep.segments
-
-        while True:
-
-            t_st = time.time()
-
-            for i in range(sweep.segments):
-                logger.debug("Sweep segment no %d", i)
-
-                #Interrupción Stop
-                if self.stopped:
-                    logger.debug("Stopping sweeping as signalled")
+        try:
+            while True:
+                item = segments.get()
+                if item is None:
                     break
-                    ############
-
-                start, stop = sweep.get_index_range(i)
-                #print(sweep.get_index_range(i))
-
-                freq, values11, values21 = self.readAveragedSegment(start, stop, averages)
+                if isinstance(item, BaseException):
+                    raise item
+                i, freq, values11, values21, t_read = item
 
-                self.percentage = (i + 1) * 100 / sweep.segments
+                self.percentage = (i + 1) * 100 / self.sweep.segments
 
                 #ETAPA DE FILTRADO
-                # Extraer las columnas
-                columna_1 = [fila[0] for fila in values21]
-                columna_2 = [fila[1] for fila in values21]
-
-                # Aplicar el filtro Savitzky-Golay a cada columna
-                columna_1_filtrada = savgol_filter(columna_1, window_length=11, polyorder=2)
-                columna_2_filtrada = savgol_filter(columna_2, window_length=11, polyorder=2)
-
-                # Recomponer la matriz filtrada (opcional)
-                values21 = [[columna_1_filtrada[i], columna_2_filtrada[i]] for i in range(len(columna_1_filtrada))]
+                values21 = self._smooth(values21)
 
                 # Supongamos que `signal` es tu lista de datos y `frequencies` es la lista de frecuencias correspondientes
                 #frequencies = np.array(freq)  # lista de frecuencias
@@ -201,129 +244,241 @@ class SweepWorker(QtCore.QRunnable):
                 #corrected_signal = signal - baseline
                 #values21 = corrected_signal.tolist()
 
-
                 self.updateData(freq, values11, values21, i)
 
-                #print(self.data21[i])
-
-
-            #Condicional de Barrido Simple / Continuo
-            self.inic = self.inic+1
-
-            s11 = self.data11
-            self.alls11.append(s11)
-
-            s21 = self.data21
-            self.alls21.append(s21)
-
-
-            if sweep.properties.mode == SweepMode.SINGLE:
-
-                if sweep.properties.anmode == 0: #Analizar
-
-                    mg = -100
-                    cont = 0
-
-
-                    for i in s21:
-                        if i.gain > mg:
-                            #if -0.5 < i.phase * (180 / 3.14) < 0.5:
-                                self.actm = i.gain
-                                self.actf = i.freq
-                                self.actg = i.phase * (180 / self.pi)
-                                self.actfr = cont
-                                mg = i.gain
-                        cont = cont + 1
-
-                    self.mg.append(self.actm)
-                    self.fr.append(self.actf)
-                    self.dg.append(self.actg)
-
-                if sweep.properties.anmode == 1:
-
-                    self.actm = s21[self.actfr].gain
-                    self.actf = s21[self.actfr].freq
-                    self.actg = s21[self.actfr].phase * (180 / self.pi)
-
-                    self.mg.append(self.actm)
-                    self.fr.append(self.actf)
-                    self.dg.append(self.actg)
-
-                tact = time.time()
-                self.actt = round(tact - t_st, 2)
+                if i < self.sweep.segments - 1:
+                    continue
 
-                self.ttr = round(self.ttr + self.actt, 2)
-                self.tm.append(self.ttr)
+                #Condicional de Barrido Simple / Continuo
+                self.inic = self.inic+1
+                self._analyse_sweep(
+                    self.sweep, round(t_read - t_st, 2), filename)
 
-                self.signals.calcnow.emit()
-                break
-
-            if sweep.properties.mode == SweepMode.CONTINOUS:
-
-                if sweep.properties.anmode == 0 :
-
-                    mg = -100
-                    cont = 0
-
-                    for i in s21:
-                        if i.gain > mg:
-                            if -0.1 < i.phase* (180 / self.pi) < 0.1:
-                                self.actm = i.gain
-                                self.actf = i.freq
-                                self.actg = i.phase * (180 / self.pi)
-                                self.actfr = cont
-                                mg = i.gain
-                        cont=cont+1
-
-                    self.mg.append(self.actm)
-                    self.fr.append(self.actf)
-                    self.dg.append(self.actg)
-
-                if sweep.properties.anmode == 1:
-
-                    self.actm = s21[self.actfr].gain
-                    self.actf = s21[self.actfr].freq
-                    self.actg = s21[self.actfr].phase * (180/self.pi)
-
-                    self.mg.append(self.actm)
-                    self.fr.append(self.actf)
-                    self.dg.append(self.actg)
-
-                tact = time.time()
-                self.actt = round(tact - t_st, 2)
-
-                self.ttr = round (self.ttr + self.actt , 2)
-                self.tm.append(self.ttr)
-
-
-                letra='x'
-                posf = filename.rfind('B')
-                faux = filename[:posf] + str(self.inic) + letra + filename[posf:]
-                ts = Touchstone(faux)
-                ts.sdata[0] = s11
-                ts.sdata[1] = s21
-                for dp in s11:
-                    ts.sdata[2].append(Datapoint(dp.freq, 0, 0))
-                    ts.sdata[3].append(Datapoint(dp.freq, 0, 0))
-                ts.save(4)
-
-                self.signals.calcnow.emit()
-
-            if self.inic == self.nstop:
-                break
+                if not sweep.properties.mode.continuous:
+                    break
+                if self.inic == self.nstop:
+                    break
+                if sweep.properties.mode == SweepMode.ZOOM:
+                    next_sweep = self._zoom_sweep(sweep)
+                    if next_sweep is not self.sweep:
+                        self.sweep = next_sweep
+                        self.init_data()
+                    sweeps.put(next_sweep)
+        finally:
+            done.set()
+            reader.join()
+            self.writer.flush()
+            self._close_store()
+            if self.writer.dropped:
+                logger.warning("%d sweep snapshots were not saved",
+                               self.writer.dropped)
+
+    def _read_loop(self, sweep: Sweep, averages: int,
+                   segments: queue.Queue, sweeps: queue.Queue,
+                   done: threading.Event) -> None:
+        try:
+            count = 0
+            while True:
+                for i in range(sweep.segments):
+                    logger.debug("Sweep segment no %d", i)
+                    #Interrupción Stop
+                    if self.stopped or done.is_set():
+                        logger.debug("Stopping sweeping as signalled")
+                        return
+                    start, stop = sweep.get_index_range(i)
+                    freq, values11, values21 = self.readAveragedSegment(
+                        start, stop, averages)
+                    if not freq:
+                        return
+                    self._put_segment(
+                        segments, done,
+                        (i, freq, values11, values21, time.time()))
+                count += 1
+                if (not sweep.properties.mode.continuous or
+                        count == self.nstop):
+                    return
+                if sweep.properties.mode == SweepMode.ZOOM:
+                    sweep = self._get_sweep(sweeps, done)
+                    if sweep is None:
+                        return
+        except BaseException as exc:  # pylint: disable=broad-except
+            self._put_segment(segments, done, exc)
+        finally:
+            self._put_segment(segments, done, None)
+
+    @staticmethod
+    def _put_segment(segments: queue.Queue, done: threading.Event, item):
+        # wait for the processing stage, but never outlive the sweep
+        while not done.is_set():
+            try:
+                segments.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get_sweep(self, sweeps: queue.Queue,
+                   done: threading.Event) -> Optional[Sweep]:
+        while not (self.stopped or done.is_set()):
+            try:
+                return sweeps.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _zoom_sweep(self, full: Sweep) -> Sweep:
+        """next zoom mode sweep, following the resonance of the last one"""
+        points = len(self.frequencies)
+        margin = max(1, round(points * self.zoom_margin))
+        if (not self.tracked or
+                not margin <= self.actfr < points - margin):
+            if self.sweep is not full:
+                logger.info("Resonance lost, widening to %d-%d",
+                            full.start, full.end)
+            return full
+        if (self.sweep is full or
+                abs(self.actfr - (points - 1) / 2) > points / 4):
+            logger.debug("Zooming to %d Hz", self.actf)
+            return full.zoom(self.actf, full.span / self.zoom_ratio)
+        return self.sweep
+
+    @staticmethod
+    def _smooth(values: np.ndarray) -> np.ndarray:
+        # Aplicar el filtro Savitzky-Golay a parte real e imaginaria
+        return (savgol_filter(values.real, window_length=11, polyorder=2) +
+                1j * savgol_filter(values.imag, window_length=11, polyorder=2))
+
+    def _analyse_sweep(self, sweep: Sweep, t_sweep: float, filename: str):
+        self.history.append(t_sweep, self.frequencies, self.s11, self.s21)
+        if sweep.properties.mode == SweepMode.AVERAGE:
+            # averaged sweeps are only kept, not analysed
+            return
 
+        self.tracked = False
+        if sweep.properties.anmode == 0: #Analizar
+            window = (math.inf if sweep.properties.mode == SweepMode.SINGLE
+                      else 0.1)
+            resonance = track_resonance(self.frequencies, self.s21, window)
+            if resonance:
+                self.tracked = True
+                self.actfr, self.actf, self.actm, self.actg = resonance
+                self.actfe = math.nan
+                if self.peak_fit:
+                    (self.actf, self.actm, self.actg,
+                     self.actfe) = fit_resonance(
+                        self.frequencies, self.s21, resonance.index,
+                        self.peak_fit_points, self.peak_fit)
+
+        if sweep.properties.anmode == 1:
+            _, self.actf, self.actm, self.actg = resonance_at(
+                self.frequencies, self.s21, self.actfr)
+
+        # sweep period as seen at the device, not the host
+        self.actt = round(t_sweep - self.ttr, 2)
+        self.ttr = t_sweep
+        self.tm.append(self.ttr)
+
+        if sweep.properties.anmode in (0, 1):
+            self.mg.append(self.actm)
+            self.fr.append(self.actf)
+            self.dg.append(self.actg)
+            # the values of an earlier sweep are not a new sample
+            if self.tracked or sweep.properties.anmode == 1:
+                for name, value in (("fr", self.actf), ("mg", self.actm),
+                                    ("dg", self.actg)):
+                    self.stats[name].add(self.ttr, value)
+
+        if sweep.properties.mode.continuous and filename:
+            self._store_sweep(filename)
+            if self.s2p_snapshots:
+                directory, name = os.path.split(filename)
+                faux = os.path.join(directory, f"{self.inic}x{name}")
+                # S12 and S22 are written as zeros
+                self.writer.put(faux, self.frequencies, self.s11, self.s21)
+
+        self.signals.calcnow.emit(
+            {name: stats.summary() for name, stats in self.stats.items()})
+
+    def _run_filename(self) -> str:
+        """run_name.s2p in the sweep directory, "" if it is unusable"""
+        directory = self.app.settings.value(
+            "SweepDirectory", os.path.expanduser("~"), str)
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as exc:
+            logger.error("Unable to create %s, sweeps are not stored: %s",
+                         directory, exc)
+            return ""
+        return os.path.join(directory, f"{self.run_name}.s2p")
+
+    def _store_sweep(self, filename: str):
+        anmode = self.sweep.properties.anmode in (0, 1)
+        try:
+            if (self.store is not None and not np.array_equal(
+                    self.store.frequencies, self.frequencies)):
+                # zoom mode: one store per frequency axis
+                self._close_store()
+            if self.store is None:
+                zoom = (f"_{self.inic}" if self.sweep.properties.mode ==
+                        SweepMode.ZOOM else "")
+                self.store = SweepStore.create(
+                    f"{os.path.splitext(filename)[0]}_"
+                    f"{time.strftime('%Y%m%d_%H%M%S')}{zoom}.sweeps",
+                    self.frequencies)
+            self.store.append(
+                self.ttr, self.s11, self.s21,
+                *((self.actf, self.actm, self.actg) if anmode else ()))
+        except OSError as exc:
+            logger.error("Unable to store sweep %d: %s", self.inic, exc)
+
+    def _close_store(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _datapoints(self, name: str) -> List[Datapoint]:
+        """Datapoint list of the buffer name, the same list object until
+        the buffer changes"""
+        if name not in self._lists:
+            self._lists[name] = to_datapoints(self.frequencies,
+                                              getattr(self, name))
+        return self._lists[name]
+
+    @property
+    def data11(self) -> List[Datapoint]:
+        return self._datapoints("s11")
+
+    @data11.setter
+    def data11(self, data: List[Datapoint]):
+        self.s11[:len(data)] = from_datapoints(data)[1]
+        self._lists.pop("s11", None)
+
+    @property
+    def data21(self) -> List[Datapoint]:
+        return self._datapoints("s21")
+
+    @data21.setter
+    def data21(self, data: List[Datapoint]):
+        self.s21[:len(data)] = from_datapoints(data)[1]
+        self._lists.pop("s21", None)
+
+    @property
+    def rawData11(self) -> List[Datapoint]:
+        return self._datapoints("raw_s11")
+
+    @property
+    def rawData21(self) -> List[Datapoint]:
+        return self._datapoints("raw_s21")
 
     def init_data(self):
-        self.data11 = []
-        self.data21 = []
-        self.rawData11 = []
-        self.rawData21 = []
-        for freq in self.sweep.get_frequencies():
-            self.data11.append(Datapoint(freq, 0.0, 0.0))
-            self.data21.append(Datapoint(freq, 0.0, 0.0))
-            self.rawData11.append(Datapoint(freq, 0.0, 0.0))
-            self.rawData21.append(Datapoint(freq, 0.0, 0.0))
-        logger.debug("Init data length: %s", len(self.data11))
+        self.frequencies = np.fromiter(self.sweep.get_frequencies(),
+                                       dtype=np.int64)
+        size = len(self.frequencies)
+        self.s11 = np.zeros(size, dtype=np.complex128)
+        self.s21 = np.zeros(size, dtype=np.complex128)
+        self.raw_s11 = np.zeros(size, dtype=np.complex128)
+        self.raw_s21 = np.zeros(size, dtype=np.complex128)
+        self._lists.clear()
+        logger.debug("Init data length: %s", size)
 
     def updateData(self, frequencies, values11, values21, index):
         # Update the data from (i*101) to (i+1)*101
@@ -331,55 +486,62 @@ class SweepWorker(QtCore.QRunnable):
             "Calculating data and inserting in existing data at index %d",
             index)
         offset = self.sweep.points * index
-
-        raw_data11 = [Datapoint(freq, values11[i][0], values11[i][1])
-                      for i, freq in enumerate(frequencies)]
-        raw_data21 = [Datapoint(freq, values21[i][0], values21[i][1])
-                      for i, freq in enumerate(frequencies)]
-
-        data11, data21 = self.applyCalibration(raw_data11, raw_data21)
+        seg = slice(offset, offset + len(frequencies))
+
+        self.frequencies[seg] = frequencies
+        self.raw_s11[seg] = values11
+        self.raw_s21[seg] = values21
+        self.s11[seg], self.s21[seg] = self._calibrate(
+            self.frequencies[seg], self.raw_s11[seg], self.raw_s21[seg],
+            key=(self._grid_key(), index))
         logger.debug("update Freqs: %s, Offset: %s", len(frequencies), offset)
-        for i in range(len(frequencies)):
-            self.data11[offset + i] = data11[i]
-            self.data21[offset + i] = data21[i]
-            self.rawData11[offset + i] = raw_data11[i]
-            self.rawData21[offset + i] = raw_data21[i]
+        # new lists for the new data, only the segment is converted
+        self._lists.pop("raw_s11", None)
+        self._lists.pop("raw_s21", None)
+        for name in ("s11", "s21"):
+            if name in self._lists:
+                old = self._lists[name]
+                self._lists[name] = (
+                    old[:seg.start] +
+                    to_datapoints(self.frequencies[seg],
+                                  getattr(self, name)[seg]) +
+                    old[seg.stop:])
 
         logger.debug("Saving data to application (%d and %d points)",
-                     len(self.data11), len(self.data21))
+                     len(self.s11), len(self.s21))
         self.app.saveData(self.data11, self.data21)
         logger.debug('Sending "updated" signal')
         self.signals.updated.emit()
 
+    def _grid_key(self) -> Tuple:
+        sweep = self.sweep
+        return (sweep.start, sweep.end, sweep.points, sweep.segments,
+                sweep.properties.logarithmic)
+
+    def _calibrate(self, freq: np.ndarray,
+                   raw11: np.ndarray,
+                   raw21: np.ndarray,
+                   key: Tuple = None) -> Tuple[np.ndarray, np.ndarray]:
+        cal = self.app.calibration
+        s11, s21 = raw11, raw21
+        if cal.isCalculated and cal.isValid1Port():
+            s11 = cal.correct11_array(freq, raw11, key)
+        if cal.isCalculated and cal.isValid2Port():
+            s21 = cal.correct21_array(freq, raw21, raw11, key)
+        if self.offsetDelay != 0:
+            s11 = correct_delay_array(freq, s11, self.offsetDelay,
+                                      reflect=True)
+            s21 = correct_delay_array(freq, s21, self.offsetDelay)
+        return s11, s21
+
     def applyCalibration(self,
                          raw_data11: List[Datapoint],
                          raw_data21: List[Datapoint]
                          ) -> Tuple[List[Datapoint], List[Datapoint]]:
-        data11: List[Datapoint] = []
-        data21: List[Datapoint] = []
-
-        if not self.app.calibration.isCalculated:
-            data11 = raw_data11.copy()
-            data21 = raw_data21.copy()
-        elif self.app.calibration.isValid1Port():
-            data11.extend(self.app.calibration.correct11(dp)
-                          for dp in raw_data11)
-        else:
-            data11 = raw_data11.copy()
-
-        if self.app.calibration.isValid2Port():
-            for counter, dp in enumerate(raw_data21):
-                dp11 = raw_data11[counter]
-                data21.append(self.app.calibration.correct21(dp, dp11))
-        else:
-            data21 = raw_data21
-
-        if self.offsetDelay != 0:
-            data11 = [correct_delay(dp, self.offsetDelay, reflect=True)
-                      for dp in data11]
-            data21 = [correct_delay(dp, self.offsetDelay) for dp in data21]
-
-        return data11, data21
+        freq, raw11 = from_datapoints(raw_data11)
+        raw21 = from_datapoints(raw_data21)[1]
+        s11, s21 = self._calibrate(freq, raw11, raw21)
+        return to_datapoints(freq, s11), to_datapoints(freq, s21)
 
     def readAveragedSegment(self, start, stop, averages=1):
         values11 = []
@@ -398,7 +560,7 @@ class SweepWorker(QtCore.QRunnable):
             retry = 0
             tmp11 = []
             tmp21 = []
-            while not tmp11 and retry < 5:
+            while len(tmp11) == 0 and retry < 5:
                 sleep(0.5 * retry)
                 retry += 1
                 freq, tmp11, tmp21 = self.readSegment(start, stop)
@@ -422,8 +584,8 @@ class SweepWorker(QtCore.QRunnable):
             values21 = truncate(values21, truncates)
 
         logger.debug("Averaging %d values", len(values11))
-        values11 = np.average(values11, 0).tolist()
-        values21 = np.average(values21, 0).tolist()
+        values11 = np.average(values11, 0)
+        values21 = np.average(values21, 0)
 
         return freq, values11, values21
 
@@ -440,31 +602,29 @@ class SweepWorker(QtCore.QRunnable):
             return [], [], []
         return frequencies, values11, values21
 
-    def readData(self, data):
+    def readData(self, data) -> np.ndarray:
         logger.debug("Reading %s", data)
         done = False
-        returndata = []
+        returndata = np.empty(0, dtype=np.complex128)
         count = 0
         while not done:
             done = True
-            returndata = []
-            tmpdata = self.app.vna.readValues(data)
-            logger.debug("Read %d values", len(tmpdata))
-            for d in tmpdata:
-                a, b = d.split(" ")
-                try:
-                    if self.app.vna.validateInput and (
-                            abs(float(a)) > 9.5 or
-                            abs(float(b)) > 9.5):
+            try:
+                returndata = self.app.vna.readValuesArray(data)
+                logger.debug("Read %d values", len(returndata))
+                if self.app.vna.validateInput:
+                    invalid = np.flatnonzero(
+                        (np.abs(returndata.real) > 9.5) |
+                        (np.abs(returndata.imag) > 9.5))
+                    if invalid.size:
                         logger.warning(
-                            "Got a non plausible data value: (%s)", d)
+                            "Got a non plausible data value: (%s)",
+                            returndata[invalid[0]])
                         done = False
-                        break
-                    returndata.append((float(a), float(b)))
-                except ValueError as exc:
-                    logger.exception("An exception occurred reading %s: %s",
-                                     data, exc)
-                    done = False
+            except ValueError as exc:
+                logger.exception("An exception occurred reading %s: %s",
+                                 data, exc)
+                done = False
             if not done:
                 logger.debug("Re-reading %s", data)
                 sleep(0.2)
@@ -0,0 +1,57 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Growing time series for the plots of a run
+
+Samples are written into preallocated arrays which double in size when
+full, so an append costs the same after hours as in the first minute.
+time and value are views of the filled part, e.g. the data of a plot
+curve.
+"""
+import numpy as np
+
+
+class TimeSeries:
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1:
+            raise ValueError(f"Illegal capacity {capacity}")
+        self._time = np.empty(capacity)
+        self._value = np.empty(capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, time: float, value: float):
+        if self._size == len(self._time):
+            # views handed out before keep the old arrays
+            self._time = np.resize(self._time, 2 * self._size)
+            self._value = np.resize(self._value, 2 * self._size)
+        self._time[self._size] = time
+        self._value[self._size] = value
+        self._size += 1
+
+    def clear(self):
+        self._size = 0
+
+    @property
+    def time(self) -> np.ndarray:
+        return self._time[:self._size]
+
+    @property
+    def value(self) -> np.ndarray:
+        return self._value[:self._size]
@@ -17,20 +17,39 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
-import math
-import cmath
 import io
+import queue
+import threading
 from operator import attrgetter
 
-from typing import List
+from typing import List, Sequence, TextIO, Tuple
 
+import numpy as np
 from scipy.interpolate import interp1d
 
-from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.RFTools import Datapoint, from_datapoints, to_datapoints
 
 logger = logging.getLogger(__name__)
 
 
+def format_data(freq: np.ndarray, values: Sequence[np.ndarray]) -> str:
+    """Touchstone RI data lines of complex value columns over freq"""
+    columns = [np.asarray(freq, dtype=np.int64)]
+    for value in values:
+        columns += [value.real, value.imag]
+    # shortest round trip float text, one format operation per line
+    line = " ".join(["%d"] + ["%r"] * (len(columns) - 1)) + "\n"
+    return "".join(line % row for row in zip(*(c.tolist() for c in columns)))
+
+
+def write_data(outfile: TextIO, freq: np.ndarray,
+               values: Sequence[np.ndarray], chunk_size: int = 1024):
+    """write the data lines to outfile, chunk_size points at a time"""
+    for start in range(0, len(freq), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        outfile.write(format_data(freq[chunk], [v[chunk] for v in values]))
+
+
 class Options:
     # Fun fact: In Touchstone 1.1 spec all params are optional unordered.
     # Just the line has to start with "#"
@@ -187,20 +206,20 @@ class Touchstone:
                 continue
             return line
 
-    def _append_line_data(self, freq: int, data: list):
-        data_list = iter(self.sdata)
-        vals = iter(data)
-        for v in vals:
-            if self.opts.format == "ri":
-                next(data_list).append(Datapoint(freq, float(v),
-                                                 float(next(vals))))
-            if self.opts.format == "ma":
-                z = cmath.rect(float(v), math.radians(float(next(vals))))
-                next(data_list).append(Datapoint(freq, z.real, z.imag))
-            if self.opts.format == "db":
-                z = cmath.rect(10 ** (float(v) / 20),
-                               math.radians(float(next(vals))))
-                next(data_list).append(Datapoint(freq, z.real, z.imag))
+    def _append_data(self, freq: np.ndarray, values: np.ndarray):
+        """append rows of value pairs in opts.format as Datapoints"""
+        pairs = values.reshape(len(values), -1, 2)
+        first, second = pairs[..., 0], pairs[..., 1]
+        if self.opts.format == "ri":
+            real, imag = first, second
+        else:
+            mag = first if self.opts.format == "ma" else 10 ** (first / 20)
+            phase = np.radians(second)
+            real, imag = mag * np.cos(phase), mag * np.sin(phase)
+        data = np.empty(real.shape, dtype=np.complex128)
+        data.real, data.imag = real, imag
+        for datalist, column in zip(self.sdata, data.T):
+            datalist.extend(to_datapoints(freq, column))
 
     def load(self):
         logger.info("Attempting to open file %s", self.filename)
@@ -220,13 +239,11 @@ class Touchstone:
             logger.exception("Failed to parse %s: %s", self.filename, e)
 
     def _loads(self, s: str):
-        need_reorder = False
         with io.StringIO(s) as file:
             opts_line = self._parse_comments(file)
             self.opts.parse(opts_line)
 
-            prev_freq = 0.0
-            prev_len = 0
+            lines = []
             for line in file:
                 line = line.strip()
                 # ignore empty lines (even if not specified)
@@ -237,31 +254,39 @@ class Touchstone:
                     logger.warning("Comment after header: %s", line)
                     self.comments.append(line)
                     continue
-
-                # ignore comments at data end
-                data = line.split('!')[0]
-                data = data.split()
-                freq, data = round(float(data[0]) * self.opts.factor), data[1:]
-                data_len = len(data)
-                if data_len % 2 != 0:
-                    raise TypeError("Data values aren't pairs: " + line)
-
-                # consistency checks
-                if freq <= prev_freq:
-                    logger.warning("Frequency not ascending: %s", line)
-                    need_reorder = True
-                prev_freq = freq
-
-                if prev_len == 0:
-                    prev_len = data_len
-                elif data_len != prev_len:
-                    raise TypeError(f"Inconsistent number of pairs: {line}")
-
-                self._append_line_data(freq, data)
-            if need_reorder:
+                lines.append(line)
+
+        # ignore comments at data end
+        fields = [line.split('!')[0].split() for line in lines]
+        counts = np.fromiter(map(len, fields), dtype=np.int64,
+                             count=len(fields))
+
+        # consistency checks, data up to the first bad line is kept
+        bad = np.flatnonzero((counts % 2 == 0) |
+                             (counts != counts[:1]))
+        rows = bad[0] if len(bad) else len(fields)
+        error = None
+        if rows < len(fields):
+            error = (f"Data values aren't pairs: {lines[rows]}"
+                     if counts[rows] % 2 == 0 else
+                     f"Inconsistent number of pairs: {lines[rows]}")
+        if rows:
+            values = np.array(
+                [v for row in fields[:rows] for v in row],
+                dtype=np.float64).reshape(rows, -1)
+            freq = np.round(values[:, 0] * self.opts.factor).astype(np.int64)
+
+            not_ascending = np.flatnonzero(
+                np.diff(freq, prepend=0) <= 0)
+            for i in not_ascending:
+                logger.warning("Frequency not ascending: %s", lines[i])
+            self._append_data(freq, values[:, 1:])
+            if len(not_ascending) and error is None:
                 logger.warning("Reordering data")
                 for datalist in self.sdata:
                     datalist.sort(key=attrgetter("freq"))
+        if error:
+            raise TypeError(error)
 
     def save(self, nr_params: int = 1):
         """Save touchstone data to file.
@@ -270,29 +295,94 @@ class Touchstone:
             nr_params: Number of s-parameters. 2 for s1p, 4 for s2p
         """
 
+        freq, values = self._data_arrays(nr_params)
         logger.info("Attempting to open file %s for writing",
                     self.filename)
         with open(self.filename, "w", encoding="utf-8") as outfile:
-            outfile.write(self.saves(nr_params))
+            outfile.write("# HZ S RI R 50\n")
+            write_data(outfile, freq, values)
 
     def saves(self, nr_params: int = 1) -> str:
         """Returns touchstone data as string.
         Args:
             nr_params: Number of s-parameters. 1 for s1p, 4 for s2p
         """
+        freq, values = self._data_arrays(nr_params)
+        with io.StringIO() as outfile:
+            outfile.write("# HZ S RI R 50\n")
+            write_data(outfile, freq, values)
+            return outfile.getvalue()
+
+    def _data_arrays(self, nr_params: int) -> Tuple[np.ndarray,
+                                                    List[np.ndarray]]:
         assert nr_params in {1, 4}
 
-        ts_str = "# HZ S RI R 50\n"
-        for i, dp_s11 in enumerate(self.s11):
-            ts_str += f"{dp_s11.freq} {dp_s11.re} {dp_s11.im}"
-            for j in range(1, nr_params):
-                dp = self.sdata[j][i]
-                if dp.freq != dp_s11.freq:
-                    raise LookupError("Frequencies of sdata not correlated")
-                ts_str += f" {dp.re} {dp.im}" #aca anexabamos anexcond para s11, lo sacamos para s2p
-            ts_str += "\n"
-        return ts_str
+        freq, s11 = from_datapoints(self.s11)
+        values = [s11]
+        for j in range(1, nr_params):
+            freq_j, values_j = from_datapoints(self.sdata[j][:len(freq)])
+            if not np.array_equal(freq_j, freq):
+                raise LookupError("Frequencies of sdata not correlated")
+            values.append(values_j)
+        return freq, values
 
     def anexcond(p: Datapoint) -> float: #no usar en saves
       return (1/(p.impedance)).real
 
+
+class TouchstoneWriter:
+    """Writes s2p snapshots on a background thread
+
+    At most queue_size snapshots wait for the disk. put() never blocks
+    the caller, further snapshots are dropped and counted in dropped.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self._thread = None
+
+    def put(self, filename: str, freq: np.ndarray,
+            s11: np.ndarray, s21: np.ndarray) -> bool:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="TouchstoneWriter", daemon=True)
+            self._thread.start()
+        try:
+            self.queue.put_nowait(
+                (filename, np.copy(freq), np.copy(s11), np.copy(s21)))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Dropped snapshot %s, writer is %d behind"
+                           " (%d dropped)", filename, self.queue.qsize(),
+                           self.dropped)
+            return False
+        return True
+
+    def flush(self):
+        """wait until all queued snapshots are written"""
+        self.queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                filename, freq, s11, s21 = item
+                zeros = np.zeros_like(s11)
+                with open(filename, "w", encoding="utf-8") as outfile:
+                    outfile.write("# HZ S RI R 50\n")
+                    write_data(outfile, freq, (s11, s21, zeros, zeros))
+                self.written += 1
+            except OSError as exc:
+                logger.error("Failed to write %s: %s", item[0], exc)
+            finally:
+                self.queue.task_done()
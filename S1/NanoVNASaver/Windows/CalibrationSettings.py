@@ -689,7 +689,7 @@ class CalibrationWindow(QtWidgets.QWidget):
             self.btn_automatic.setDisabled(False)
             return
 
-        if self.app.sweep.properties.mode == SweepMode.CONTINOUS:
+        if self.app.sweep.properties.mode.continuous:
             QtWidgets.QMessageBox(
                 QtWidgets.QMessageBox.Information,
                 "Barrido Continuo Habilitado",
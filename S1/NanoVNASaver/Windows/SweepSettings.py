@@ -1,4 +1,5 @@
 import logging
+import os
 from functools import partial
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtGui import QIntValidator
@@ -60,14 +61,25 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         self.barrido_simple = QtWidgets.QRadioButton("Barrido Simple")
         self.barrido_simple.setMinimumHeight(20)
         self.barrido_simple.clicked.connect(lambda : self.input_nsweeps.setEnabled(False))
+        self.barrido_simple.clicked.connect(lambda : self.zoom.setEnabled(False))
         sweep_btn_layout.addWidget(self.barrido_simple)
 
         self.barridos_sucesivos = QtWidgets.QRadioButton("Barridos sucesivos")
         self.barridos_sucesivos.setMinimumHeight(20)
         self.barridos_sucesivos.clicked.connect(lambda : self.input_nsweeps.setEnabled(True))
+        self.barridos_sucesivos.clicked.connect(lambda : self.zoom.setEnabled(True))
         sweep_btn_layout.addWidget(self.barridos_sucesivos)
 
         sweep_btn_layout.addWidget(self.input_nsweeps)
+
+        # Narrow the continuous sweeps around the resonance
+        self.zoom = QtWidgets.QCheckBox("Zoom en resonancia")
+        self.zoom.setMinimumHeight(20)
+        self.zoom.setToolTip(
+            "Barre 1/10 del rango con la misma densidad de puntos.\n"
+            "Solo es más rápido con más de un segmento.")
+        self.zoom.setEnabled(False)
+        sweep_btn_layout.addWidget(self.zoom)
         layout.addRow(sweep_btn_layout)
 
         metodo_btn_layout = QtWidgets.QHBoxLayout()
@@ -82,6 +94,32 @@ class SweepSettingsWindow(QtWidgets.QWidget):
 
         layout.addRow((metodo_btn_layout))
 
+        # Where continuous runs are stored
+        dir_btn_layout = QtWidgets.QHBoxLayout()
+
+        self.sweep_dir = QtWidgets.QLineEdit(self.app.settings.value(
+            "SweepDirectory", os.path.expanduser("~"), str))
+        self.sweep_dir.setMinimumHeight(20)
+        self.sweep_dir.editingFinished.connect(
+            lambda: self.update_directory(self.sweep_dir.text()))
+        dir_btn_layout.addWidget(self.sweep_dir)
+
+        dir_bt = QtWidgets.QPushButton("...")
+        dir_bt.setFixedHeight(20)
+        dir_bt.clicked.connect(self.select_directory)
+        dir_btn_layout.addWidget(dir_bt)
+
+        self.snapshots = QtWidgets.QCheckBox("Guardar s2p de cada barrido")
+        self.snapshots.setMinimumHeight(20)
+        self.snapshots.setChecked(
+            self.app.settings.value("SweepSnapshots", False, bool))
+        self.snapshots.toggled.connect(
+            lambda checked: self.app.settings.setValue(
+                "SweepSnapshots", checked))
+        dir_btn_layout.addWidget(self.snapshots)
+
+        layout.addRow("Carpeta de barridos", dir_btn_layout)
+
 
         ok_btn_layout = QtWidgets.QHBoxLayout()
 
@@ -197,7 +235,9 @@ class SweepSettingsWindow(QtWidgets.QWidget):
                 elif self.barridos_sucesivos.isChecked():
 
                         with self.app.sweep.lock:
-                            self.app.sweep.properties.mode = SweepMode.CONTINOUS
+                            self.app.sweep.properties.mode = (
+                                SweepMode.ZOOM if self.zoom.isChecked()
+                                else SweepMode.CONTINOUS)
 
                         if not self.input_nsweeps.text() :
                             QtWidgets.QMessageBox.warning(self, "Error", "Número de Barridos Incorrecto")
@@ -215,6 +255,17 @@ class SweepSettingsWindow(QtWidgets.QWidget):
                     return
 
 
+    def select_directory(self):
+        directory = QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Carpeta de barridos", self.sweep_dir.text())
+        if directory:
+            self.sweep_dir.setText(directory)
+            self.update_directory(directory)
+
+    def update_directory(self, directory: str):
+        logger.debug("update_directory(%s)", directory)
+        self.app.settings.setValue("SweepDirectory", directory)
+
     def update_padding(self, padding: int):
         logger.debug("update_padding(%s)", padding)
         self.padding = padding
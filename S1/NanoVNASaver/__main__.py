@@ -6,6 +6,7 @@ import sys
 from PyQt5 import QtWidgets, QtCore
 
 from NanoVNASaver.About import VERSION, INFO
+from NanoVNASaver.Hardware import Hardware
 from NanoVNASaver.NanoVNASaverNEW import NanoVNASaver
 from NanoVNASaver.Touchstone import Touchstone
 
@@ -25,6 +26,15 @@ def main():
     parser.add_argument("-r", "--ref-file",
                         help="Touchstone file to load as reference for off"
                         " device usage")
+    parser.add_argument("-s", "--simulator", action="store_true",
+                        help="Offer simulated devices for usage without"
+                        " hardware")
+    parser.add_argument("--record",
+                        help="File to record the serial traffic of the"
+                        " device to")
+    parser.add_argument("--replay",
+                        help="Capture file to replay as device for off"
+                        " device usage")
     parser.add_argument("--version", action="version",
                         version=f"NanoVNASaver {VERSION}")
     args = parser.parse_args()
@@ -37,6 +47,10 @@ def main():
     if args.debug:
         console_log_level = logging.DEBUG
 
+    Hardware.SIMULATE = args.simulator
+    Hardware.RECORD = args.record or ""
+    Hardware.REPLAY = args.replay or ""
+
     logger = logging.getLogger("NanoVNASaver")
     logger.setLevel(logging.DEBUG)
 
@@ -61,3 +61,46 @@ class AnalyticsTools(unittest.TestCase):
     def test_dip_cut_offs(self):
         self.assertEqual(at.dip_cut_offs(SINEWAVE, .8, .9), (47, 358))
         self.assertEqual(at.dip_cut_offs(SINEWAVE[:90], .8, .9), (47, 88))
+
+    def test_track_resonance(self):
+        freq = np.arange(100, 105)
+        s21 = np.array([0.1, 0.5j, 0.3, 0.3, 1e-6])
+        self.assertEqual(at.track_resonance(freq, s21),
+                         at.Resonance(1, 101, 20 * math.log10(0.5), 90.0))
+        self.assertEqual(at.track_resonance(freq, s21, window=2),
+                         at.Resonance(2, 102, 20 * math.log10(0.3), 0.0))
+        self.assertIsNone(at.track_resonance(freq, s21, floor=0))
+        self.assertIsNone(at.track_resonance(freq, np.zeros(5)))
+        self.assertEqual(at.resonance_at(freq, s21, 4).gain, -120.0)
+
+    def test_fit_resonance(self):
+        freq = np.linspace(90e6, 110e6, 41)
+        center = 100.2e6
+        s21 = 0.5 / (1 + 2j * (freq - center) / 2e6)
+        index = at.track_resonance(freq, s21).index
+        fit = at.fit_resonance(freq, s21, index)
+        self.assertAlmostEqual(fit.freq, center, delta=1)
+        self.assertAlmostEqual(fit.gain, 20 * math.log10(0.5))
+        self.assertAlmostEqual(fit.phase, 0.0, delta=0.5)
+        self.assertLess(fit.freq_error, 1)
+        fit = at.fit_resonance(freq, s21, index, model="parabolic")
+        self.assertAlmostEqual(fit.freq, center, delta=50e3)
+        # three points determine the fit, no uncertainty
+        self.assertTrue(math.isnan(
+            at.fit_resonance(freq, s21, index, points=3).freq_error))
+        # no peak at the sweep edge
+        fit = at.fit_resonance(freq, s21, 0)
+        self.assertEqual(fit.freq, freq[0])
+        self.assertTrue(math.isnan(fit.freq_error))
+        with self.assertRaises(ValueError):
+            at.fit_resonance(freq, s21, index, model="gaussian")
+
+    def test_fit_resonance_sharp(self):
+        # the fitted 1/|S21|^2 has its vertex below zero
+        freq = 100e6 + np.arange(5) * 10e3
+        s21 = np.sqrt(1 / np.array([100, 10, 1, 10, 100]))
+        grid = at.resonance_at(freq, s21, 2)
+        fit = at.fit_resonance(freq, s21, 2)
+        self.assertEqual((fit.freq, fit.gain, fit.phase),
+                         (freq[2], grid.gain, grid.phase))
+        self.assertTrue(math.isnan(fit.freq_error))
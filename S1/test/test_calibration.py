@@ -0,0 +1,125 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Calibration import Calibration
+from NanoVNASaver.RFTools import Datapoint
+
+FREQS = [1000000 + 100000 * i for i in range(51)]
+E00 = 0.05 + 0.02j
+E11 = 0.1 - 0.05j
+DELTA_E = -0.9 + 0.1j
+E30 = 0.001 + 0.002j
+E10E32 = 0.8 + 0.1j
+
+
+def measured(gamma: complex) -> complex:
+    return (E00 - gamma * DELTA_E) / (1 - gamma * E11)
+
+
+def measured21(gamma: complex, s21: complex) -> complex:
+    # port 2 matched, see make_calibration()
+    return E30 + E10E32 * s21 / (1 - gamma * E11)
+
+
+def make_calibration(two_port: bool = False) -> Calibration:
+    cal = Calibration()
+    for name, gamma in (("short", -1), ("open", 1), ("load", 0)):
+        gm = measured(gamma)
+        cal.insert(name, [Datapoint(f, gm.real, gm.imag) for f in FREQS])
+    if two_port:
+        # a through reflecting like the load gives e22 = 0
+        for name, value in (("through", E30 + E10E32),
+                            ("thrurefl", E00),
+                            ("isolation", E30)):
+            cal.insert(name, [Datapoint(f, value.real, value.imag)
+                              for f in FREQS])
+    cal.calc_corrections()
+    return cal
+
+
+class TestCalibration(unittest.TestCase):
+
+    def test_correct11(self):
+        cal = make_calibration()
+        dut = 0.3 - 0.4j
+        gm = measured(dut)
+        corrected = cal.correct11(Datapoint(FREQS[3], gm.real, gm.imag))
+        self.assertAlmostEqual(corrected.z, dut)
+
+    def test_correct_arrays(self):
+        cal = make_calibration(two_port=True)
+        freq = np.linspace(FREQS[0] - 50000, FREQS[-1] + 50000, 137)
+        rng = np.random.default_rng(1)
+        # a DUT measured through the known error terms
+        dut11 = 0.9 * rng.random(137) * np.exp(2j * np.pi * rng.random(137))
+        dut21 = rng.normal(size=137) + 1j * rng.normal(size=137)
+        s11 = measured(dut11)
+        s21 = measured21(dut11, dut21)
+        np.testing.assert_allclose(cal.correct11_array(freq, s11), dut11)
+        np.testing.assert_allclose(cal.correct21_array(freq, s21, s11),
+                                   dut21)
+        dp11 = Datapoint(freq[5], s11[5].real, s11[5].imag)
+        dp21 = Datapoint(freq[5], s21[5].real, s21[5].imag)
+        self.assertAlmostEqual(cal.correct21(dp21, dp11).z, dut21[5])
+
+    def test_error_terms_cache(self):
+        cal = make_calibration()
+        freq = np.array(FREQS[:10])
+        terms = cal.error_terms(freq, key=("sweep", 0))
+        self.assertIs(cal.error_terms(freq, key=("sweep", 0)), terms)
+        self.assertIsNot(cal.error_terms(freq + 1, key=("sweep", 0)), terms)
+        terms = cal.error_terms(freq, key=("sweep", 0))
+        revision = cal.revision
+        cal.calc_corrections()
+        self.assertGreater(cal.revision, revision)
+        self.assertIsNot(cal.error_terms(freq, key=("sweep", 0)), terms)
+        np.testing.assert_allclose(
+            cal.correct11_array(freq, freq * 0j, key=("sweep", 0)),
+            cal.correct11_array(freq, freq * 0j))
+
+    def test_non_ideal_standards(self):
+        cal = Calibration()
+        cal.useIdealShort = cal.useIdealOpen = cal.useIdealLoad = False
+        cal.loadC = 1e-13
+        cal.loadL = 1e-10
+        for name, gamma in (("short", cal.gamma_short),
+                            ("open", cal.gamma_open),
+                            ("load", cal.gamma_load)):
+            cal.insert(name, [
+                Datapoint(f, measured(gamma(f)).real, measured(gamma(f)).imag)
+                for f in FREQS])
+        cal.calc_corrections()
+        self.assertAlmostEqual(cal.dataset.get(FREQS[5])["e00"], E00)
+        self.assertAlmostEqual(cal.dataset.get(FREQS[5])["delta_e"], DELTA_E)
+        freq = np.array(FREQS, dtype=np.float64)
+        np.testing.assert_allclose(
+            cal.correct11_array(freq, measured(cal.gamma_open(freq))),
+            cal.gamma_open(freq))
+
+    def test_same_standards(self):
+        cal = Calibration()
+        for name in ("short", "open", "load"):
+            cal.insert(name, [Datapoint(f, 0.5, 0.5) for f in FREQS])
+        self.assertRaisesRegex(ValueError, f"at frequency {FREQS[0]}Hz",
+                               cal.calc_corrections)
+        self.assertFalse(cal.isCalculated)
@@ -19,13 +19,16 @@
 import math
 import unittest
 
+import numpy as np
+
 # Import targets to be tested
 from NanoVNASaver.RFTools import Datapoint, \
     norm_to_impedance, impedance_to_norm, \
     reflection_coefficient, gamma_to_impedance, clamp_value, \
     parallel_to_serial, serial_to_parallel, \
     impedance_to_capacitance, impedance_to_inductance, \
-    groupDelay, corr_att_data
+    groupDelay, group_delay, group_delays, corr_att_data, \
+    to_datapoints, from_datapoints
 
 
 class TestRFTools(unittest.TestCase):
@@ -121,6 +124,29 @@ class TestRFTools(unittest.TestCase):
         self.assertAlmostEqual(groupDelay(dpoints, 1), -9.514e-5)
         self.assertEqual(groupDelay(dpoints0, 1), 0.0)
 
+    def test_group_delay(self):
+        # a 100 ns line, the phase wraps every 10 MHz
+        freq = np.arange(100, 140) * 1_000_000
+        values = 0.5 * np.exp(-2j * np.pi * freq * 100e-9)
+        delay = group_delay(freq, values)
+        np.testing.assert_allclose(delay, 100e-9)
+        data = to_datapoints(freq, values)
+        self.assertAlmostEqual(groupDelay(data, 0), delay[0])
+        self.assertAlmostEqual(groupDelay(data, 17), delay[17])
+        self.assertEqual(group_delay(freq[:1], values[:1]).tolist(), [])
+        self.assertEqual(groupDelay(data[:1], 0), 0)
+        self.assertEqual(group_delay([1, 1], [1, 1j]).tolist(), [0.0, 0.0])
+
+        cached = group_delays(data)
+        np.testing.assert_allclose(cached, delay)
+        self.assertIs(group_delays(data), cached)
+        self.assertIs(group_delays(data[:]), cached)
+        self.assertFalse(cached.flags.writeable)
+        # changed in place
+        data[5] = Datapoint(data[5].freq, 1, 0)
+        self.assertIsNot(group_delays(data), cached)
+        self.assertNotEqual(group_delays(data)[5], cached[5])
+
     def test_cor_att_data(self):
         dp1 = [
             Datapoint(100000, 0.1091, 0.3118),
@@ -134,6 +160,21 @@ class TestRFTools(unittest.TestCase):
         dp3 = corr_att_data(dp1, -10)
         self.assertEqual(dp1, dp3)
 
+    def test_datapoint_arrays(self):
+        dp1 = [
+            Datapoint(100000, 0.1091, 0.3118),
+            Datapoint(100001, 0.1091, 0.3124),
+            Datapoint(100002, -0.5, 0.0),
+        ]
+        freq, values = from_datapoints(dp1)
+        self.assertEqual(freq.tolist(), [100000, 100001, 100002])
+        self.assertEqual(values[2], complex(-0.5, 0.0))
+        self.assertEqual(to_datapoints(freq, values), dp1)
+        self.assertIsInstance(to_datapoints(freq, values)[0].freq, int)
+        freq, values = from_datapoints([])
+        self.assertEqual(len(freq), 0)
+        self.assertEqual(to_datapoints(freq, values), [])
+
 
 class TestRFToolsDatapoint(unittest.TestCase):
 
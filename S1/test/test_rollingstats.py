@@ -0,0 +1,80 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+import statistics
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.RollingStats import RollingStats
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def test_empty(self):
+        stats = RollingStats()
+        self.assertEqual(len(stats), 0)
+        for value in (stats.mean, stats.variance, stats.median,
+                      stats.slope, stats.noise):
+            self.assertTrue(math.isnan(value))
+        self.assertRaises(ValueError, RollingStats, 0)
+
+    def test_stats(self):
+        rng = np.random.default_rng(1)
+        time = np.arange(200) * 0.5
+        values = 122e6 + 40 * time + rng.normal(0, 3, len(time))
+        stats = RollingStats(window=50)
+        for t, value in zip(time, values):
+            stats.add(t, value)
+        stats.add(100.0, math.nan)
+        self.assertEqual(len(stats), 200)
+        self.assertEqual(stats.last, values[-1])
+        self.assertAlmostEqual(stats.mean, values.mean(), delta=1e-6)
+        self.assertAlmostEqual(stats.variance / values.var(ddof=1), 1,
+                               places=9)
+        window_t, window = time[-50:], values[-50:]
+        self.assertEqual(stats.median, np.median(window))
+        slope, offset = np.polyfit(window_t, window, 1)
+        self.assertAlmostEqual(stats.slope, slope, places=6)
+        residual = window - (slope * window_t + offset)
+        self.assertAlmostEqual(
+            stats.noise, math.sqrt((residual ** 2).sum() / 48), places=6)
+
+        summary = stats.summary()
+        self.assertEqual((summary.count, summary.median, summary.slope),
+                         (200, stats.median, stats.slope))
+
+        stats.reset()
+        self.assertEqual(len(stats), 0)
+        self.assertTrue(math.isnan(stats.median))
+
+    def test_median(self):
+        rng = np.random.default_rng(2)
+        # repeated values, then a drift that never brings old samples
+        # to the top of their heap
+        values = np.concatenate((rng.integers(0, 5, 300).astype(float),
+                                 np.arange(300.0)))
+        for window in (1, 2, 7, 30):
+            stats = RollingStats(window)
+            for i, value in enumerate(values):
+                stats.add(float(i), value)
+                self.assertEqual(
+                    stats.median,
+                    statistics.median(values[max(0, i + 1 - window):i + 1]))
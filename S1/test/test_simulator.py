@@ -0,0 +1,132 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+import platform
+import tempfile
+import threading
+import time
+import tty
+import unittest
+
+import numpy as np
+import serial
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.Capture import (
+    RecordingInterface, ReplayInterface, capture_filename, read_capture,
+    split_sessions, OPEN, TX, RX)
+from NanoVNASaver.Hardware.Hardware import get_VNA
+from NanoVNASaver.Hardware.Serial import Interface, drain_serial
+from NanoVNASaver.Hardware.Simulator import Resonator, simulator_interface
+
+
+@unittest.skipIf(platform.system() == 'Windows', "needs a pseudo terminal")
+class TestCases(unittest.TestCase):
+
+    def sweep(self, comment: str, iface=None):
+        iface = iface or simulator_interface(
+            comment, Resonator(center=122_000_000, noise=0, scan_time=0))
+        iface.open()
+        try:
+            vna = get_VNA(iface)
+            vna.datapoints = 201
+            vna.setSweep(120_000_000, 124_000_000)
+            freq = np.array(vna.readFrequencies())
+            s11 = vna.readValuesArray("data 0")
+            s21 = vna.readValuesArray("data 1")
+        finally:
+            iface.close()
+        self.assertEqual(len(freq), 201)
+        self.assertEqual(freq[0], 120_000_000)
+        self.assertEqual(freq[-1], 124_000_000)
+        self.assertEqual(s11.shape, (201,))
+        self.assertEqual(freq[np.argmax(abs(s21))], 122_000_000)
+        self.assertEqual(freq[np.argmin(abs(s11))], 122_000_000)
+        return s11, s21
+
+    def test_text_protocol(self):
+        self.sweep("Simulator")
+
+    def test_v2_protocol(self):
+        self.sweep("Simulator-V2")
+
+    def test_record_replay(self):
+        for comment in ("Simulator", "Simulator-V2"):
+            with tempfile.TemporaryDirectory() as tmp:
+                capture = os.path.join(tmp, "sweep.cap")
+                port = simulator_interface(comment, Resonator(
+                    noise=1e-4, scan_time=0)).port
+                recorder = RecordingInterface('serial', comment, capture)
+                recorder.port = port
+                # a reconnect and a new interface on the same device
+                # append to the capture
+                recorded = [self.sweep(comment, recorder),
+                            self.sweep(comment, recorder)]
+                recorder = RecordingInterface('serial', comment, capture)
+                recorder.port = port
+                recorded.append(self.sweep(comment, recorder))
+
+                name, transfers = read_capture(capture)
+                self.assertEqual(name, comment)
+                self.assertEqual({t.direction for t in transfers},
+                                 {OPEN, TX, RX})
+                self.assertEqual(len(split_sessions(transfers)), 3)
+
+                replay = ReplayInterface(capture)
+                for s11, s21 in recorded:
+                    replayed = self.sweep(comment, replay)
+                    np.testing.assert_array_equal(s11, replayed[0])
+                    np.testing.assert_array_equal(s21, replayed[1])
+
+    def test_capture_filename(self):
+        self.assertEqual(capture_filename("/tmp/sweep.cap", "/dev/ttyACM0"),
+                         "/tmp/sweep_ttyACM0.cap")
+        self.assertEqual(capture_filename("sweep.cap", "COM3"),
+                         "sweep_COM3.cap")
+
+    def test_serial_reader(self):
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        iface = Interface('serial', "pty")
+        iface.port = os.ttyname(slave)
+        iface.open()
+        try:
+            # the tail of a slow reply is drained, not read as the answer
+            def reply():
+                for _ in range(10):
+                    os.write(master, b"0.1 0.2\r\n")
+                    time.sleep(0.02)
+            writer = threading.Thread(target=reply)
+            writer.start()
+            time.sleep(0.01)
+            drain_serial(iface)
+            self.assertFalse(writer.is_alive())
+            self.assertEqual(iface.in_waiting, 0)
+
+            iface.timeout = 1
+            os.write(master, b"ch> ")
+            self.assertEqual(iface.read(4), b"ch> ")
+            # unplugged
+            os.close(master)
+            self.assertRaises(serial.SerialException, iface.read, 4)
+            self.assertFalse(iface.reading)
+            self.assertRaises(serial.SerialException, iface.readline)
+        finally:
+            iface.close()
+            os.close(slave)
@@ -19,7 +19,7 @@
 import unittest
 
 # Import targets to be tested
-from NanoVNASaver.Settings.Sweep import Sweep, Properties
+from NanoVNASaver.Settings.Sweep import Sweep, Properties, SweepMode
 
 
 class TestCases(unittest.TestCase):
@@ -45,3 +45,26 @@ class TestCases(unittest.TestCase):
 
         sweep2 = sweep.copy()
         self.assertEqual(sweep, sweep2)
+
+    def test_zoom(self):
+        sweep = Sweep(100_000_000, 110_000_000, 101, 4)
+        zoom = sweep.zoom(105_000_000, 1_000_000)
+        self.assertEqual((zoom.start, zoom.end, zoom.points, zoom.segments),
+                         (104_500_000, 105_500_000, 101, 1))
+        self.assertIs(zoom.properties, sweep.properties)
+        # kept inside the full span
+        self.assertEqual(sweep.zoom(100_100_000, 1_000_000).start,
+                         100_000_000)
+        self.assertEqual(sweep.zoom(120_000_000, 1_000_000).end,
+                         110_000_000)
+        self.assertEqual(sweep.zoom(105_000_000, 10).span, 202)
+        self.assertEqual(sweep.zoom(105_000_000, 1e9).span, sweep.span)
+        # the point density of the full sweep, in fewer segments
+        sweep = Sweep(100_000_000, 110_000_000, 101, 20)
+        self.assertEqual(sweep.zoom(105_000_000, 2_000_000).segments, 4)
+        self.assertEqual(sweep.zoom(105_000_000, 1e9).segments, 20)
+
+    def test_mode(self):
+        self.assertFalse(SweepMode.SINGLE.continuous)
+        self.assertTrue(SweepMode.CONTINOUS.continuous)
+        self.assertTrue(SweepMode.ZOOM.continuous)
@@ -0,0 +1,159 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.SweepStore import (
+    SweepHistory, SweepStore, load_snapshots, SNAPSHOT_CACHE)
+from NanoVNASaver.Touchstone import Touchstone
+
+FREQS = np.linspace(120_000_000, 124_000_000, 11).astype(np.int64)
+
+
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "run.sweeps")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append(self):
+        store = SweepStore.create(self.filename, FREQS)
+        self.assertEqual(len(store), 0)
+        for i in range(3):
+            store.append(1.5 * i, FREQS * 1e-9 + i * 1j, FREQS * 1j * i,
+                         fr=FREQS[i], mg=-i, dg=0.5)
+        store.close()
+
+        store = SweepStore(self.filename)
+        np.testing.assert_array_equal(store.frequencies, FREQS)
+        self.assertEqual(len(store), 3)
+        np.testing.assert_array_equal(store.records["time"], [0, 1.5, 3])
+        np.testing.assert_array_equal(store.records["fr"], FREQS[:3])
+        np.testing.assert_array_equal(store[2]["s21"], FREQS * 2j)
+        np.testing.assert_array_equal(store[1]["s11"], FREQS * 1e-9 + 1j)
+        self.assertIsInstance(store.records, np.memmap)
+
+        store.append(4.5, FREQS * 0, FREQS * 0)
+        self.assertEqual(len(store), 4)
+        self.assertTrue(np.isnan(store[3]["mg"]))
+        store.close()
+
+    def test_incomplete_record(self):
+        store = SweepStore.create(self.filename, FREQS)
+        store.append(1, FREQS * 0, FREQS * 0)
+        store.close()
+        with open(self.filename, "ab") as outfile:
+            outfile.write(b"\0" * 20)
+        store = SweepStore(self.filename)
+        self.assertEqual(len(store), 1)
+        store.append(2, FREQS * 0, FREQS * 0)
+        np.testing.assert_array_equal(store.records["time"], [1, 2])
+        store.close()
+
+    def test_not_a_store(self):
+        with open(self.filename, "wb") as outfile:
+            outfile.write(b"# HZ S RI R 50\n")
+        self.assertRaises(IOError, SweepStore, self.filename)
+
+    def test_load_snapshots(self):
+        ts = Touchstone("./test/data/valid.s2p")
+        ts.load()
+        first = ts.s21[0].re
+        for i in (1, 2, 10):
+            ts.filename = os.path.join(self.tmp.name, f"{i}xBarrido.s2p")
+            ts.save(4)
+            ts.s21[0] = ts.s21[0]._replace(re=i)
+
+        store = load_snapshots(self.tmp.name, processes=2)
+        self.assertEqual(store.records["s21"].shape, (3, 1020))
+        np.testing.assert_array_equal(store.frequencies,
+                                      [dp.freq for dp in ts.s11])
+        np.testing.assert_array_equal(store.records["s21"][:, 0].real,
+                                      [first, 1, 2])
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tmp.name, SNAPSHOT_CACHE)))
+
+        # unchanged files are not parsed again, new ones are appended
+        self.assertEqual(len(load_snapshots(self.tmp.name, processes=1)), 3)
+        ts.filename = os.path.join(self.tmp.name, "11xBarrido.s2p")
+        ts.save(4)
+        store = load_snapshots(self.tmp.name, processes=1)
+        np.testing.assert_array_equal(store.records["s21"][:, 0].real,
+                                      [first, 1, 2, 10])
+        # the sweep numbers, whatever the file times
+        np.testing.assert_array_equal(store.records["time"], [1, 2, 10, 11])
+
+        ts.filename = os.path.join(self.tmp.name, "2xBarrido.s2p")
+        ts.s21.pop()
+        ts.s11.pop()
+        ts.save()
+        self.assertRaises(ValueError, load_snapshots, self.tmp.name,
+                          processes=1)
+        self.assertRaises(FileNotFoundError, load_snapshots,
+                          self.tmp.name, "*.s1p")
+
+    def test_history(self):
+        store = SweepStore.create(self.filename, FREQS)
+        history = SweepHistory(3, len(FREQS), spill=store.append)
+        self.assertEqual(len(history.last()), 0)
+        for i in range(5):
+            history.append(float(i), FREQS, np.full(11, i + 1j),
+                           np.full(11, -i + 0j))
+        self.assertEqual((len(history), history.dropped), (3, 2))
+        last = history.last()
+        self.assertEqual(list(last["time"]), [2.0, 3.0, 4.0])
+        self.assertEqual(last["s21"].shape, (3, 11))
+        self.assertEqual(list(history.last(2)["time"]), [3.0, 4.0])
+        # views, not copies
+        self.assertIs(history.last().base, history.last(1).base)
+        self.assertEqual(list(store.records["time"]), [0.0, 1.0])
+        np.testing.assert_array_equal(store[1]["s11"], np.full(11, 1 + 1j))
+        store.close()
+
+        history.append(5.0, FREQS[:4], np.zeros(4), np.ones(4))
+        freq, s11, s21 = history[-1]
+        np.testing.assert_array_equal(freq, FREQS[:4])
+        self.assertTrue(np.isnan(history.last(1)["s21"][0, 4:]).all())
+        s11, s21 = history.datapoints(0)
+        self.assertEqual((s11[0].freq, s21[0].re), (FREQS[0], -3.0))
+        self.assertRaises(IndexError, history.__getitem__, 3)
+        self.assertRaises(ValueError, history.append, 6.0,
+                          np.arange(12), np.zeros(12), np.zeros(12))
+        history.clear()
+        self.assertEqual((len(history), history.dropped), (0, 0))
+
+    def test_history_growth(self):
+        history = SweepHistory(5, len(FREQS))
+        # allocated as sweeps arrive, up to depth
+        self.assertEqual(len(history._buffer), 2)
+        for i in range(12):
+            history.append(float(i), FREQS, np.full(11, i + 0j),
+                           np.zeros(11))
+            times = list(range(max(0, i - 4), i + 1))
+            self.assertEqual(list(history.last()["time"]), times)
+            self.assertEqual(history[0][1][0], times[0])
+        self.assertEqual(len(history._buffer), 10)
+        self.assertEqual(history.dropped, 7)
@@ -0,0 +1,52 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020,2021 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver.TimeSeries import TimeSeries
+
+
+class TestTimeSeries(unittest.TestCase):
+
+    def test_append(self):
+        series = TimeSeries(capacity=2)
+        self.assertEqual(len(series), 0)
+        self.assertEqual(series.time.tolist(), [])
+        for i in range(5):
+            series.append(i * 0.5, -i)
+        self.assertEqual(len(series), 5)
+        self.assertEqual(series.time.tolist(), [0.0, 0.5, 1.0, 1.5, 2.0])
+        self.assertEqual(series.value.tolist(), [0, -1, -2, -3, -4])
+        self.assertRaises(ValueError, TimeSeries, 0)
+
+    def test_views(self):
+        series = TimeSeries(capacity=2)
+        series.append(0.0, 1.0)
+        series.append(1.0, 2.0)
+        time, value = series.time, series.value
+        series.append(2.0, 3.0)
+        # growing leaves earlier views alone
+        self.assertEqual(time.tolist(), [0.0, 1.0])
+        self.assertEqual(value.tolist(), [1.0, 2.0])
+
+        series.clear()
+        self.assertEqual(len(series), 0)
+        series.append(5.0, 6.0)
+        self.assertEqual(series.time.tolist(), [5.0])
+        self.assertEqual(series.value.tolist(), [6.0])
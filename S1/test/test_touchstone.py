@@ -20,8 +20,10 @@ import unittest
 import logging
 import os
 
+import numpy as np
+
 # Import targets to be tested
-from NanoVNASaver.Touchstone import Options, Touchstone
+from NanoVNASaver.Touchstone import Options, Touchstone, TouchstoneWriter
 from NanoVNASaver.RFTools import Datapoint
 
 
@@ -193,3 +195,24 @@ class TestTouchstoneTouchstone(unittest.TestCase):
         ts.s11[0] = Datapoint(100, 0.1, 0.1)
         self.assertRaisesRegex(
             LookupError, "Frequencies of sdata not correlated", ts.saves, 4)
+
+    def test_writer(self):
+        ts = Touchstone("./test/data/valid.s2p")
+        ts.load()
+        writer = TouchstoneWriter(queue_size=2)
+        filename = "./test/data/output_writer.s2p"
+        freq = [dp.freq for dp in ts.s11]
+        s11 = [complex(dp.re, dp.im) for dp in ts.s11]
+        s21 = [complex(dp.re, dp.im) for dp in ts.s21]
+        self.assertTrue(writer.put(filename, np.array(freq),
+                                   np.array(s11), np.array(s21)))
+        writer.flush()
+        writer.close()
+        self.assertEqual(writer.written, 1)
+        self.assertEqual(writer.dropped, 0)
+        written = Touchstone(filename)
+        written.load()
+        os.remove(filename)
+        self.assertEqual(written.s11, ts.s11)
+        self.assertEqual(written.s21, ts.s21)
+        self.assertEqual(written.s22[0], Datapoint(freq[0], 0, 0))